@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def _default_cache_path() -> str:
+    base = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "bashbard", "llm-cache.sqlite3")
+
+
+def model_tag(llm: Any) -> str:
+    """Identify the provider/model so a model switch never serves stale results."""
+    model = getattr(llm, "model", None) or getattr(llm, "model_name", None) or ""
+    return f"{type(llm).__name__}:{model}"
+
+
+def cache_key(llm: Any, prompt: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(model_tag(llm).encode("utf-8"))
+    h.update(b"\0")
+    h.update(prompt.encode("utf-8"))
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """Persistent key/value store for parsed LLM results.
+
+    Env:
+      - BASHBARD_CACHE: set to "0" to disable caching
+      - BASHBARD_CACHE_PATH: sqlite file (default ~/.cache/bashbard/llm-cache.sqlite3)
+      - BASHBARD_CACHE_TTL: entry lifetime in seconds (default 3600)
+
+    Writes are handed to a background thread and committed in batches, so
+    storing a result never adds disk I/O to the request that produced it.
+    Recently used entries are also kept in a bounded in-memory LRU.
+    """
+
+    FLUSH_DELAY_SECONDS = 0.5
+    MEMORY_ENTRIES = 1024
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: Optional[int] = None) -> None:
+        self.enabled = os.getenv("BASHBARD_CACHE", "1") != "0"
+        self.path = path or os.getenv("BASHBARD_CACHE_PATH") or _default_cache_path()
+        if ttl_seconds is None:
+            try:
+                ttl_seconds = int(os.getenv("BASHBARD_CACHE_TTL", "3600"))
+            except ValueError:
+                # Caching is best-effort; a malformed setting means the default
+                ttl_seconds = 3600
+        self.ttl = ttl_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        # _lock guards the in-memory dicts; _db_lock serializes use of the sqlite
+        # connection, so a commit in progress never blocks memory/pending hits
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        # key -> (serialized value, created); visible to get() until committed
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        self._wakeup = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        # key -> (value, created) for hits that skip sqlite and JSON decoding
+        self._memory: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and self.enabled:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, created REAL)")
+                self._conn = conn
+            except Exception:
+                # Caching is best-effort; never fail a request because of it
+                self.enabled = False
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                value, created = hit
+                if self.ttl > 0 and time.time() - created > self.ttl:
+                    del self._memory[key]
+                    return None
+                self._memory.move_to_end(key)
+                return dict(value)
+            row = self._pending.get(key)
+        if row is None:
+            with self._db_lock:
+                conn = self._connect()
+                if conn is None:
+                    return None
+                try:
+                    row = conn.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+                except Exception:
+                    return None
+        if row is None:
+            return None
+        value, created = row
+        if self.ttl > 0 and time.time() - created > self.ttl:
+            return None
+        try:
+            out = json.loads(value)
+        except Exception:
+            return None
+        with self._lock:
+            self._remember(key, out, created)
+        return dict(out)
+
+    def _remember(self, key: str, value: Dict[str, Any], created: float) -> None:
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        try:
+            row = (json.dumps(value), time.time())
+        except Exception:
+            return
+        with self._lock:
+            self._pending[key] = row
+            self._remember(key, dict(value), row[1])
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="bashbard-cache", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+        self._wakeup.set()
+
+    def flush(self) -> None:
+        """Commit every pending entry in a single transaction.
+
+        The sqlite work runs outside the lock that get() and set() take; the
+        entries stay visible in _pending until the commit has finished.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            batch = dict(self._pending)
+        with self._db_lock:
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO cache (key, value, created) VALUES (?, ?, ?)",
+                        [(k, v, created) for k, (v, created) in batch.items()],
+                    )
+                    conn.commit()
+                except Exception:
+                    pass
+        with self._lock:
+            for key, row in batch.items():
+                # A newer set() for the same key is still waiting for the next flush
+                if self._pending.get(key) is row:
+                    del self._pending[key]
+
+    def _write_loop(self) -> None:
+        while True:
+            self._wakeup.wait()
+            # Let a burst of results accumulate into one commit
+            time.sleep(self.FLUSH_DELAY_SECONDS)
+            self._wakeup.clear()
+            self.flush()
+
+
+class SemanticCache:
+    """In-process nearest-neighbour cache over embedded `/e` requests.
+
+    Catches near-duplicates ("list big files" / "show large files") that the
+    exact prompt hash misses. Disabled unless enabled via env and both
+    sentence-transformers and numpy are importable.
+
+    Env:
+      - BASHBARD_SEMANTIC_CACHE: set to "1" to enable
+      - BASHBARD_SEMANTIC_MODEL: embedding model (default sentence-transformers/all-MiniLM-L6-v2)
+      - BASHBARD_SEMANTIC_THRESHOLD: minimum cosine similarity for a hit (default 0.92)
+    """
+
+    MAX_ENTRIES = 1024
+
+    def __init__(self) -> None:
+        self.enabled = os.getenv("BASHBARD_SEMANTIC_CACHE", "0") == "1"
+        self.model_name = os.getenv("BASHBARD_SEMANTIC_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        try:
+            self.threshold = float(os.getenv("BASHBARD_SEMANTIC_THRESHOLD", "0.92"))
+        except ValueError:
+            # A threshold we can't read could serve loose matches; leave the feature off
+            self.threshold = 0.92
+            self.enabled = False
+        self._model: Any = None
+        self._np: Any = None
+        # model_tag(llm) -> (float32 (N, dim) L2-normalized rows, values), so a
+        # model switch never serves another model's translations
+        self._entries: Dict[str, Tuple[Any, list[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _load(self) -> bool:
+        if self._model is not None:
+            return True
+        # Concurrent first lookups must not load the embedding model twice
+        with self._load_lock:
+            if self._model is None and self.enabled:
+                try:
+                    import numpy  # type: ignore
+                    from sentence_transformers import SentenceTransformer  # type: ignore
+
+                    self._np = numpy
+                    self._model = SentenceTransformer(self.model_name)
+                except Exception:
+                    # Optional feature; fall back to exact caching only
+                    self.enabled = False
+        return self._model is not None
+
+    def _embed(self, text: str) -> Any:
+        if not self._load():
+            return None
+        try:
+            return self._model.encode(text, normalize_embeddings=True).astype(self._np.float32)
+        except Exception:
+            # An embedding failure is just a miss; the exact cache and provider still work
+            return None
+
+    def get(self, llm: Any, text: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled or not text:
+            return None
+        q = self._embed(text)
+        if q is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(model_tag(llm))
+            if entry is None:
+                return None
+            vectors, values = entry
+            scores = vectors @ q
+            best = int(scores.argmax())
+            if float(scores[best]) < self.threshold:
+                return None
+            return dict(values[best])
+
+    def set(self, llm: Any, text: str, value: Dict[str, Any]) -> None:
+        if not self.enabled or not text:
+            return
+        q = self._embed(text)
+        if q is None:
+            return
+        tag = model_tag(llm)
+        with self._lock:
+            row = q.reshape(1, -1)
+            entry = self._entries.get(tag)
+            if entry is None:
+                self._entries[tag] = (row, [dict(value)])
+                return
+            vectors, values = entry
+            self._entries[tag] = (
+                self._np.vstack((vectors[-(self.MAX_ENTRIES - 1):], row)),
+                values[-(self.MAX_ENTRIES - 1):] + [dict(value)],
+            )
@@ -3,13 +3,24 @@ from __future__ import annotations
 import argparse
 from dotenv import load_dotenv  # type: ignore
 
-from .graph import build_graph
 from .state import State
-from .llm import get_llm  # ensures provider packages are available
 
 # Load .env from project root (working directory)
 load_dotenv()
 
+_QUIT_COMMANDS = frozenset(("/q", "/quit", "/exit"))
+
+_LEGACY_HELP = (
+    "Commands:\n"
+    "  /e <request>  - natural language to command\n"
+    "  /run          - disable dry-run (execute commands)\n"
+    "  /dry          - enable dry-run (default)\n"
+    "  /quiet        - reduce console output\n"
+    "  /verbose      - verbose console output\n"
+    "  /q            - quit\n"
+    "  Otherwise: typed line is executed as a shell command"
+)
+
 
 def parse_args():
     p = argparse.ArgumentParser(description="Agentic Shell Guard")
@@ -58,10 +69,16 @@ def _interactive_shell():
 
 def _legacy_interactive_shell():
     """Legacy interactive shell for fallback/compatibility."""
-    _ = get_llm  # explicitly reference to avoid linter removal of import
+    # LangGraph and the nodes load only once a mode that needs them is chosen,
+    # so --help and argument errors return without importing them
+    from .graph import build_graph
+    from .nodes import warm_llm
+
+    warm_llm()
     app = build_graph()
     print("Agentic Shell Guard interactive mode (legacy). Type '/help' for commands.\n")
-    flags = {"dry_run": False, "quiet": False, "interactive": True}
+    # Flags toggled by slash commands; copied into a fresh state per line
+    flags: State = {"dry_run": False, "quiet": False, "interactive": True}
     while True:
         try:
             line = input("BashBard> ").strip()
@@ -76,10 +93,10 @@ def _legacy_interactive_shell():
             continue
 
         if line.startswith('/'):
-            if line in ("/q", "/quit", "/exit"):
+            if line in _QUIT_COMMANDS:
                 break
             if line == "/help":
-                print("Commands:\n  /e <request>  - natural language to command\n  /run          - disable dry-run (execute commands)\n  /dry          - enable dry-run (default)\n  /quiet        - reduce console output\n  /verbose      - verbose console output\n  /q            - quit\n  Otherwise: typed line is executed as a shell command")
+                print(_LEGACY_HELP)
                 continue
             if line == "/run":
                 flags["dry_run"] = False
@@ -102,12 +119,14 @@ def _legacy_interactive_shell():
                 if not request:
                     print("Usage: /e <natural language request>")
                     continue
-                state: State = {"user_request": request, **flags}
+                state = flags.copy()
+                state["user_request"] = request
             else:
                 print("Unknown command. Type '/help'.")
                 continue
         else:
-            state = {"direct_command": line, **flags}
+            state = flags.copy()
+            state["direct_command"] = line
 
         out = app.invoke(state)
         _print_summary(out)
@@ -118,7 +137,8 @@ def main():
 
     # One-shot modes remain available for scripting/back-compat
     if getattr(args, "english", None):
-        _ = get_llm  # explicitly reference to avoid linter removal of import
+        from .graph import build_graph
+
         app = build_graph()
         state: State = {"user_request": args.english}
         out = app.invoke(state)
@@ -128,7 +148,8 @@ def main():
     if getattr(args, "fix", False):
         if not (args.cmd and args.err):
             raise SystemExit("--fix requires --cmd and --err")
-        _ = get_llm
+        from .graph import build_graph
+
         app = build_graph()
         state: State = {"last_command": args.cmd, "last_error": args.err}
         if args.intent:
@@ -1,15 +1,162 @@
 from __future__ import annotations
 
 import argparse
-import json
+import itertools
 import os
+import queue
+import selectors
 import socket
 import sys
 import threading
-from typing import Dict, Any
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Deque, Dict, Any, List, Optional, Tuple
 
 # Reuse existing functionality; avoid duplication
-from .nodes import from_english, from_error, danger_check
+from . import wire
+from .cache import ResponseCache, cache_key
+from .nodes import (
+    RESPONSE_CACHE,
+    cacheable_candidate,
+    candidate_from_message,
+    danger_check,
+    english_prompt,
+    ensure_llm,
+    error_prompt,
+    llm_error_candidate,
+    llm_pool,
+    warm_llm,
+)
+
+
+# LLM calls arriving within this window (or until MAX_BATCH is reached) are
+# submitted to the provider together via llm.batch().
+BATCH_WINDOW_MS = int(os.getenv("BASHBARD_BATCH_WINDOW_MS", "15"))
+MAX_BATCH = int(os.getenv("BASHBARD_MAX_BATCH", "8"))
+LLM_TIMEOUT_SECONDS = 30
+# Bounded worker pool for request handling; the reactor itself never blocks
+DAEMON_WORKERS = int(os.getenv("BASHBARD_DAEMON_WORKERS", "32"))
+
+_PROMPT_BUILDERS = {
+    "english": english_prompt,
+    "error": error_prompt,
+}
+
+
+class BatchScheduler:
+    """Coalesce concurrent from_english/from_error requests into batched LLM calls.
+
+    Results are memoized in a persistent ResponseCache keyed by model and
+    prompt, so repeated `/e` requests and identical failures skip the provider.
+    """
+
+    def __init__(self, window_ms: int = BATCH_WINDOW_MS, max_batch: int = MAX_BATCH, cache: ResponseCache | None = None) -> None:
+        self.window = max(0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.cache = cache if cache is not None else RESPONSE_CACHE
+        self._queue: "queue.Queue[Tuple[str, str, Future]]" = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, state: Dict[str, Any]) -> Future:
+        fut: Future = Future()
+        try:
+            prompt = _PROMPT_BUILDERS[kind](state)
+            key = cache_key(ensure_llm(), prompt)
+        except Exception as e:
+            fut.set_result(llm_error_candidate(e))
+            return fut
+        cached = self.cache.get(key)
+        if cached is not None:
+            fut.set_result(cached)
+            return fut
+        self._queue.put((prompt, key, fut))
+        self._ensure_worker()
+        return fut
+
+    @staticmethod
+    def wait(fut: Future, timeout: float = LLM_TIMEOUT_SECONDS) -> Dict[str, Any]:
+        try:
+            return fut.result(timeout=timeout)
+        except FuturesTimeoutError:
+            # Nobody is waiting any more; a batch that hasn't started skips it
+            fut.cancel()
+            return llm_error_candidate(TimeoutError("LLM request timed out"))
+        except Exception as e:
+            return llm_error_candidate(e)
+
+    def run(self, kind: str, state: Dict[str, Any], timeout: float = LLM_TIMEOUT_SECONDS) -> Dict[str, Any]:
+        return self.wait(self.submit(kind, state), timeout)
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._loop, name="bashbard-batch", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[str, str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            # Run on the shared LLM pool so a slow batch doesn't hold up the
+            # ones queued behind it; waiters give up after LLM_TIMEOUT_SECONDS
+            llm_pool().submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[str, str, Future]]) -> None:
+        # Drop requests whose waiter timed out while this batch sat in the pool
+        # queue; the rest are marked running so a late cancel() can't race set_result
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            self._dispatch(batch)
+        except Exception as e:
+            for _prompt, _key, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+
+    def _dispatch(self, batch: List[Tuple[str, str, Future]]) -> None:
+        llm = ensure_llm()
+        results = llm.batch([prompt for prompt, _key, _fut in batch], return_exceptions=True)
+        for (_prompt, key, fut), msg in zip(batch, results):
+            if isinstance(msg, Exception):
+                fut.set_result(llm_error_candidate(msg))
+                continue
+            out = candidate_from_message(msg)
+            # Plain-text fallbacks stay out of the shared cache the terminal's strict path reads
+            if cacheable_candidate(out):
+                self.cache.set(key, out)
+            fut.set_result(out)
+
+
+_SCHEDULER = BatchScheduler()
+
+# Last translation seen per `/e` request, used to speculatively danger-check
+# a likely candidate while the provider call for a fresh translation runs.
+_RECENT_CANDIDATES: "OrderedDict[str, str]" = OrderedDict()
+_RECENT_CANDIDATES_MAX = 256
+_RECENT_LOCK = threading.Lock()
+
+
+def _remember_candidate(request: str, candidate: str) -> None:
+    with _RECENT_LOCK:
+        _RECENT_CANDIDATES[request] = candidate
+        _RECENT_CANDIDATES.move_to_end(request)
+        while len(_RECENT_CANDIDATES) > _RECENT_CANDIDATES_MAX:
+            _RECENT_CANDIDATES.popitem(last=False)
 
 
 def _default_socket_path() -> str:
@@ -25,9 +172,19 @@ def _handle_preexec(payload: Dict[str, Any]) -> Dict[str, Any]:
     if cmd.startswith("/e "):
         request = cmd[3:].strip()
         state = {"user_request": request}
-        out = from_english(state)
+        fut = _SCHEDULER.submit("english", state)
+        if not fut.done():
+            with _RECENT_LOCK:
+                predicted = _RECENT_CANDIDATES.get(request)
+            if predicted:
+                # danger_check memoizes per command, so scanning the likely
+                # answer now makes the check below free when it matches.
+                danger_check({"candidate_command": predicted})
+        out = _SCHEDULER.wait(fut)
         candidate = (out.get("candidate_command") or "").strip()
         expl = out.get("candidate_explanation") or ""
+        if candidate:
+            _remember_candidate(request, candidate)
 
         if not candidate:
             return {
@@ -67,7 +224,7 @@ def _handle_postexec(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     # Ask the fixer for a suggested correction
     st: Dict[str, Any] = {"last_command": cmd, "last_error": stderr_tail}
-    out = from_error(st)
+    out = _SCHEDULER.run("error", st)
     suggestion = (out.get("candidate_command") or "").strip()
     expl = out.get("candidate_explanation") or ""
 
@@ -93,39 +250,302 @@ def _handle_event(data: Dict[str, Any]) -> Dict[str, Any]:
     return {"error": f"Unknown event: {event}"}
 
 
-def _serve_client(conn: socket.socket, addr: str, verbose: bool = False) -> None:
+def _process_line(line: bytes, verbose: bool = False) -> bytes:
+    """Handle one request frame and return the encoded reply (without the newline)."""
     try:
-        with conn:
-            buf = b""
-            while True:
-                chunk = conn.recv(65536)
-                if not chunk:
-                    break
-                buf += chunk
-                while b"\n" in buf:
-                    line, buf = buf.split(b"\n", 1)
-                    if not line.strip():
-                        continue
-                    try:
-                        req = json.loads(line.decode("utf-8", errors="replace"))
-                    except Exception as e:
-                        resp = {"error": f"Invalid JSON: {e}"}
-                    else:
-                        if verbose:
-                            print(f"[daemon] <- {req}")
-                        try:
-                            resp = _handle_event(req)
-                        except Exception as e:
-                            resp = {"error": str(e)}
-                        if verbose:
-                            print(f"[daemon] -> {resp}")
-                    conn.sendall((json.dumps(resp) + "\n").encode("utf-8"))
+        req = wire.loads(line)
     except Exception as e:
+        resp = {"error": f"Invalid JSON: {e}"}
+    else:
         if verbose:
-            print(f"[daemon] client error: {e}")
+            print(f"[daemon] <- {req}")
+        try:
+            resp = _handle_event(req)
+        except Exception as e:
+            resp = {"error": str(e)}
+        if verbose:
+            print(f"[daemon] -> {resp}")
+    return wire.dumps(resp)
+
+
+_RECV_CHUNK = 65536
+_NEWLINE = memoryview(b"\n")
+_MAX_IOV = 64
+
+
+class _Connection:
+    __slots__ = ("sock", "rbuf", "rlen", "scan_from", "framed", "outq", "pending", "busy", "waiting", "eof", "closed", "registered")
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        # Preallocated receive buffer filled with recv_into(); rbuf[:rlen] is live data
+        self.rbuf = bytearray(_RECV_CHUNK)
+        self.rlen = 0
+        self.scan_from = 0  # rbuf[:scan_from] is known to contain no newline
+        self.framed: Optional[bool] = None  # None until the first byte arrives
+        # Reply buffers awaiting send; written with sendmsg() as one scatter list
+        self.outq: Deque[memoryview] = deque()
+        self.pending: Deque[bytes] = deque()
+        self.busy = False  # a request from this connection is being handled
+        self.waiting = False  # queued for a free worker
+        self.eof = False  # peer finished sending
+        self.closed = False
+        self.registered = False
+
+
+class _Reactor:
+    """Single-threaded selector loop; LLM-bound handling runs on a bounded pool.
+
+    Requests on one connection are handled in order, one at a time, so
+    replies are written back in the order the client sent them. Each
+    connection speaks NDJSON or length-prefixed frames (see wire.py).
+    """
+
+    def __init__(self, srv: socket.socket, verbose: bool = False, workers: int = DAEMON_WORKERS) -> None:
+        self.srv = srv
+        self.verbose = verbose
+        self.sel = selectors.DefaultSelector()
+        self.max_inflight = max(1, workers)
+        self.pool = ThreadPoolExecutor(max_workers=self.max_inflight, thread_name_prefix="bashbard-daemon")
+        self._inflight = 0
+        # Connections with pending requests waiting for a free worker
+        self._ready: Deque[_Connection] = deque()
+        self._done: "queue.SimpleQueue[Tuple[_Connection, bytes]]" = queue.SimpleQueue()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False)
+        for key in list(self.sel.get_map().values()):
+            if isinstance(key.data, _Connection):
+                self._close(key.data)
+        self.sel.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def run(self) -> None:
+        if self.srv.gettimeout() != 0.0:
+            self.srv.setblocking(False)
+        self.sel.register(self.srv, selectors.EVENT_READ, None)
+        self.sel.register(self._wake_r, selectors.EVENT_READ, self._wake_r)
+        while True:
+            for key, mask in self.sel.select():
+                if key.data is None:
+                    self._accept()
+                elif key.data is self._wake_r:
+                    self._drain_done()
+                else:
+                    conn = key.data
+                    if mask & selectors.EVENT_READ:
+                        self._read(conn)
+                    if mask & selectors.EVENT_WRITE and not conn.closed:
+                        self._flush(conn)
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                sock, _addr = self.srv.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            self._update(_Connection(sock))
+
+    def _read(self, conn: _Connection) -> None:
+        while True:
+            if len(conn.rbuf) - conn.rlen < _RECV_CHUNK:
+                # Grow the receive buffer only when a frame outgrows it
+                conn.rbuf.extend(bytes(_RECV_CHUNK))
+            try:
+                with memoryview(conn.rbuf) as view:
+                    n = conn.sock.recv_into(view[conn.rlen:])
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                if self.verbose:
+                    print(f"[daemon] client error: {e}")
+                self._close(conn)
+                return
+            if not n:
+                conn.eof = True
+                break
+            conn.rlen += n
+        if conn.framed is None and conn.rlen:
+            # Sniff the protocol from the first byte of the connection
+            conn.framed = conn.rbuf[:1] == wire.FRAMED_MAGIC
+            if conn.framed:
+                conn.rlen -= 1
+                with memoryview(conn.rbuf) as view:
+                    view[:conn.rlen] = view[1:conn.rlen + 1]
+        if conn.framed:
+            ok = self._split_frames(conn)
+        else:
+            ok = self._split_lines(conn)
+        if not ok:
+            if self.verbose:
+                print("[daemon] client error: oversized frame")
+            self._close(conn)
+            return
+        self._dispatch(conn)
+        self._update(conn)
+
+    def _consume(self, conn: _Connection, view: memoryview, start: int) -> None:
+        # Move any partial frame to the front of the buffer in one memmove
+        if start:
+            remaining = conn.rlen - start
+            view[:remaining] = view[start:conn.rlen]
+            conn.rlen = remaining
+
+    def _split_lines(self, conn: _Connection) -> bool:
+        # Only scan bytes that arrived since the last pass
+        buf = conn.rbuf
+        start = 0
+        scan = conn.scan_from
+        with memoryview(buf) as view:
+            while True:
+                nl = buf.find(b"\n", scan, conn.rlen)
+                if nl < 0:
+                    break
+                line = bytes(view[start:nl])
+                start = scan = nl + 1
+                if line.strip():
+                    conn.pending.append(line)
+            self._consume(conn, view, start)
+        conn.scan_from = conn.rlen
+        return conn.rlen <= wire.MAX_FRAME
+
+    def _split_frames(self, conn: _Connection) -> bool:
+        header = wire.HEADER.size
+        start = 0
+        with memoryview(conn.rbuf) as view:
+            while conn.rlen - start >= header:
+                (length,) = wire.HEADER.unpack_from(view, start)
+                if length > wire.MAX_FRAME:
+                    return False
+                end = start + header + length
+                if end > conn.rlen:
+                    break
+                conn.pending.append(bytes(view[start + header:end]))
+                start = end
+            self._consume(conn, view, start)
+        return True
+
+    def _dispatch(self, conn: _Connection) -> None:
+        if conn.busy or conn.closed or not conn.pending:
+            return
+        if self._inflight >= self.max_inflight:
+            # Backpressure: never queue more work than there are workers
+            if not conn.waiting:
+                conn.waiting = True
+                self._ready.append(conn)
+            return
+        conn.busy = True
+        self._inflight += 1
+        self.pool.submit(self._work, conn, conn.pending.popleft())
+
+    def _work(self, conn: _Connection, line: bytes) -> None:
+        try:
+            data = _process_line(line, self.verbose)
+        except Exception as e:
+            data = wire.dumps({"error": str(e)})
+        self._done.put((conn, data))
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            # Wake-up byte already pending (or reactor shutting down)
+            pass
+
+    def _drain_done(self) -> None:
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+        while True:
+            try:
+                conn, data = self._done.get_nowait()
+            except queue.Empty:
+                break
+            conn.busy = False
+            self._inflight -= 1
+            if conn.closed:
+                continue
+            if conn.framed:
+                conn.outq.append(memoryview(wire.frame_header(len(data))))
+                conn.outq.append(memoryview(data))
+            else:
+                conn.outq.append(memoryview(data))
+                conn.outq.append(_NEWLINE)
+            self._flush(conn)
+            self._dispatch(conn)
+            self._update(conn)
+        while self._ready and self._inflight < self.max_inflight:
+            conn = self._ready.popleft()
+            conn.waiting = False
+            self._dispatch(conn)
+            self._update(conn)
+
+    def _flush(self, conn: _Connection) -> None:
+        while conn.outq:
+            try:
+                n = conn.sock.sendmsg(list(itertools.islice(conn.outq, _MAX_IOV)))
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                if self.verbose:
+                    print(f"[daemon] client error: {e}")
+                self._close(conn)
+                return
+            while n:
+                head = conn.outq[0]
+                if n >= len(head):
+                    n -= len(head)
+                    conn.outq.popleft()
+                else:
+                    conn.outq[0] = head[n:]
+                    n = 0
+        self._update(conn)
+
+    def _update(self, conn: _Connection) -> None:
+        if conn.closed:
+            return
+        events = 0
+        if not conn.eof:
+            events |= selectors.EVENT_READ
+        if conn.outq:
+            events |= selectors.EVENT_WRITE
+        if events:
+            if conn.registered:
+                self.sel.modify(conn.sock, events, conn)
+            else:
+                self.sel.register(conn.sock, events, conn)
+                conn.registered = True
+            return
+        if conn.registered:
+            self.sel.unregister(conn.sock)
+            conn.registered = False
+        # Peer is done and every reply has been written
+        if not conn.busy and not conn.pending:
+            self._close(conn)
+
+    def _close(self, conn: _Connection) -> None:
+        if conn.closed:
+            return
+        conn.closed = True
+        if conn.registered:
+            try:
+                self.sel.unregister(conn.sock)
+            except Exception:
+                pass
+            conn.registered = False
+        try:
+            conn.sock.close()
+        except Exception:
+            pass
 
 
 def serve(socket_path: str, verbose: bool = False) -> None:
+    warm_llm()
     # Ensure no stale socket exists
     try:
         if os.path.exists(socket_path):
@@ -133,19 +553,21 @@ def serve(socket_path: str, verbose: bool = False) -> None:
     except Exception:
         pass
 
-    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Create the listener non-blocking and close-on-exec in one syscall (Linux);
+    # Python's accept() already uses accept4(SOCK_CLOEXEC) for client sockets.
+    sock_type = socket.SOCK_STREAM | getattr(socket, "SOCK_NONBLOCK", 0) | getattr(socket, "SOCK_CLOEXEC", 0)
+    srv = socket.socket(socket.AF_UNIX, sock_type)
     srv.bind(socket_path)
     os.chmod(socket_path, 0o600)
     srv.listen(64)
     if verbose:
         print(f"[daemon] listening on {socket_path}")
+    reactor = _Reactor(srv, verbose=verbose)
     try:
-        while True:
-            conn, addr = srv.accept()
-            t = threading.Thread(target=_serve_client, args=(conn, str(addr), verbose), daemon=True)
-            t.start()
+        reactor.run()
     finally:
         try:
+            reactor.close()
             srv.close()
         finally:
             try:
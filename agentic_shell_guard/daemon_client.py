@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import contextlib
-import json
 import os
 import socket
 from typing import Dict, Any, Optional
 
+from . import wire
+
 
 def default_socket_path() -> str:
     user = os.getenv("USER") or str(os.getuid())
@@ -13,27 +13,78 @@ def default_socket_path() -> str:
 
 
 class DaemonClient:
+    """Daemon client that keeps one connection open across calls.
+
+    Uses the length-prefixed framing from wire.py rather than NDJSON.
+    """
+
     def __init__(self, socket_path: Optional[str] = None) -> None:
         self.socket_path = socket_path or default_socket_path()
+        self._sock: Optional[socket.socket] = None
+        self._file = None
 
-    def send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        data = json.dumps(payload) + "\n"
-        with contextlib.closing(socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)) as s:
+    def _connect(self) -> None:
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
             s.connect(self.socket_path)
-            s.sendall(data.encode("utf-8"))
-            # Read one line response
-            buf = b""
-            while True:
-                chunk = s.recv(65536)
-                if not chunk:
-                    break
-                buf += chunk
-                if b"\n" in buf:
-                    line, _rest = buf.split(b"\n", 1)
-                    try:
-                        return json.loads(line.decode("utf-8", errors="replace"))
-                    except Exception:
-                        return {"error": "Invalid JSON from daemon"}
-        return {"error": "No response from daemon"}
+        except Exception:
+            s.close()
+            raise
+        self._sock = s
+        self._file = s.makefile("rwb")
+        self._file.write(wire.FRAMED_MAGIC)
 
+    def close(self) -> None:
+        try:
+            if self._file is not None:
+                self._file.close()
+        except Exception:
+            pass
+        try:
+            if self._sock is not None:
+                self._sock.close()
+        except Exception:
+            pass
+        self._file = None
+        self._sock = None
 
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def _roundtrip(self, data: bytes) -> bytes:
+        if self._file is None:
+            self._connect()
+        self._file.write(data)
+        self._file.flush()
+        header = self._file.read(wire.HEADER.size)
+        if len(header) < wire.HEADER.size:
+            return b""
+        (length,) = wire.HEADER.unpack(header)
+        payload = self._file.read(length)
+        if len(payload) < length:
+            return b""
+        return payload
+
+    def send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        data = wire.encode_frame(payload)
+        reused = self._file is not None
+        try:
+            line = self._roundtrip(data)
+        except (BrokenPipeError, ConnectionResetError):
+            if not reused:
+                raise
+            line = b""
+        if not line and reused:
+            # Daemon restarted or dropped the idle connection; reconnect once
+            self.close()
+            line = self._roundtrip(data)
+        if not line:
+            self.close()
+            return {"error": "No response from daemon"}
+        try:
+            return wire.loads(line)
+        except Exception:
+            return {"error": "Invalid JSON from daemon"}
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import functools
+
 from langgraph.graph import StateGraph, END
 
 from .state import State
 from .nodes import (
+    INTERRUPTED_EXIT_CODE,
     route,
     from_english,
     from_error,
@@ -16,7 +19,33 @@ from .nodes import (
 )
 
 
+def _post_approval(state: State):
+    decision = state.get("approval")
+    if decision in ("auto", "approved"):
+        return "run"
+    if decision == "cancelled":
+        return "end"
+    return "replan"
+
+
+def _post_run(state: State):
+    res = state.get("result") or {}
+    exit_code = res.get("exit_code")
+    # Ctrl-C ends the run instead of going to the auto-fix path
+    if isinstance(exit_code, int) and exit_code not in (0, INTERRUPTED_EXIT_CODE):
+        return "decide"
+    return "ok"
+
+
+def _post_decision(state: State):
+    if state.get("fix_decision") == "llm":
+        return "fix"
+    return "end"
+
+
+@functools.lru_cache(maxsize=1)
 def build_graph():
+    """Compile the agent graph once; the compiled app is reusable across invocations."""
     g = StateGraph(State)
     g.add_node("from_english", from_english)
     g.add_node("from_error", from_error)
@@ -40,34 +69,12 @@ def build_graph():
     g.add_edge("from_direct", "run")
     g.add_edge("danger_check", "approval_gate")
 
-    def post_approval(state: State):
-        decision = state.get("approval")
-        if decision in ("auto", "approved"):
-            return "run"
-        if decision == "cancelled":
-            return "end"
-        return "replan"
-
-    g.add_conditional_edges("approval_gate", post_approval, {"run": "run", "replan": "replan", "end": END})
+    g.add_conditional_edges("approval_gate", _post_approval, {"run": "run", "replan": "replan", "end": END})
     g.add_edge("replan", "danger_check")
 
-    def post_run(state: State):
-        res = state.get("result") or {}
-        exit_code = res.get("exit_code")
-        if isinstance(exit_code, int) and exit_code != 0:
-            return "decide"
-        return "ok"
-
-    g.add_conditional_edges("run", post_run, {"ok": END, "decide": "error_decision"})
+    g.add_conditional_edges("run", _post_run, {"ok": END, "decide": "error_decision"})
     g.add_node("error_decision", error_decision)
 
-    def post_decision(state: State):
-        if state.get("fix_decision") == "llm":
-            return "fix"
-        return "end"
-
-    g.add_conditional_edges("error_decision", post_decision, {"fix": "from_error", "end": END})
+    g.add_conditional_edges("error_decision", _post_decision, {"fix": "from_error", "end": END})
 
     return g.compile()
-
-
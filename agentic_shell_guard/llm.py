@@ -1,23 +1,37 @@
 from __future__ import annotations
 
+import functools
 import os
 import importlib
 
 
-def get_llm():
-    """Return a chat LLM instance based on env vars.
+# Per-request timeout and SDK-level retries; slow tails are retried instead of
+# waiting out the caller's 30s cap. A malformed value falls back to the default
+# rather than stopping every entry point at import.
+try:
+    _REQUEST_TIMEOUT = float(os.getenv("BASHBARD_LLM_TIMEOUT", "8"))
+except ValueError:
+    _REQUEST_TIMEOUT = 8.0
+try:
+    _MAX_RETRIES = int(os.getenv("BASHBARD_LLM_RETRIES", "2"))
+except ValueError:
+    _MAX_RETRIES = 2
 
-    Env:
-      - LLM_PROVIDER: "openai" (default) or "google"
-      - OPENAI_MODEL: default "gpt-4o-mini"
-      - GOOGLE_MODEL: default "gemini-1.5-flash"
-    """
+
+def _resolve_config() -> tuple[str, str]:
     provider = os.getenv("LLM_PROVIDER")
     if not provider:
         # Prefer Google if GOOGLE_API_KEY is present, otherwise default to OpenAI
         provider = "google" if os.getenv("GOOGLE_API_KEY") else "openai"
     provider = provider.lower()
     if provider.startswith("goog"):
+        return "google", os.getenv("GOOGLE_MODEL", "gemini-1.5-flash")
+    return "openai", os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+
+@functools.lru_cache(maxsize=4)
+def _build_llm(provider: str, model: str):
+    if provider == "google":
         try:
             mod = importlib.import_module("langchain_google_genai")
         except ModuleNotFoundError as exc:
@@ -26,8 +40,7 @@ def get_llm():
                 "  pip install langchain-google-genai"
             ) from exc
         ChatGoogleGenerativeAI = getattr(mod, "ChatGoogleGenerativeAI")
-        model = os.getenv("GOOGLE_MODEL", "gemini-1.5-flash")
-        return ChatGoogleGenerativeAI(model=model, temperature=0)
+        return ChatGoogleGenerativeAI(model=model, temperature=0, timeout=_REQUEST_TIMEOUT, max_retries=_MAX_RETRIES)
     else:
         try:
             mod = importlib.import_module("langchain_openai")
@@ -37,7 +50,39 @@ def get_llm():
                 "  pip install langchain-openai"
             ) from exc
         ChatOpenAI = getattr(mod, "ChatOpenAI")
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        return ChatOpenAI(model=model, temperature=0)
+        return ChatOpenAI(
+            model=model,
+            temperature=0,
+            timeout=_REQUEST_TIMEOUT,
+            max_retries=_MAX_RETRIES,
+            http_client=_http_client(),
+        )
+
 
+def _http_client():
+    # Keep-alive pool shared by every call, so TCP/TLS setup is paid once
+    try:
+        import httpx  # type: ignore
+    except ModuleNotFoundError:
+        return None
+    return httpx.Client(
+        timeout=httpx.Timeout(_REQUEST_TIMEOUT, connect=5.0),
+        # Interactive use pauses for longer than httpx's 5s default between requests
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=32, keepalive_expiry=60.0),
+    )
 
+
+def get_llm():
+    """Return a chat LLM instance based on env vars.
+
+    The client is built once per (provider, model) and reused, so repeated
+    calls do not re-import the provider package or recreate its HTTP client.
+
+    Env:
+      - LLM_PROVIDER: "openai" (default) or "google"
+      - OPENAI_MODEL: default "gpt-4o-mini"
+      - GOOGLE_MODEL: default "gemini-1.5-flash"
+      - BASHBARD_LLM_TIMEOUT: per-request timeout in seconds (default 8)
+      - BASHBARD_LLM_RETRIES: SDK retries on timeout/transient errors (default 2)
+    """
+    return _build_llm(*_resolve_config())
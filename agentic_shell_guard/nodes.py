@@ -1,36 +1,168 @@
 from __future__ import annotations
 
-import json
+import functools
 import os
+import re
+import selectors
 import subprocess
-from typing import Dict
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-
+import sys
+import threading
+import time
+from typing import Dict, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+
+from . import wire
+from .cache import ResponseCache, SemanticCache, cache_key
 from .llm import get_llm
-from .safety import check_danger
+from .safety import danger_reasons
 from .state import State
 from .ux import label, code, header, warn, dim
 
 
 _LLM = None
+_LLM_LOCK = threading.Lock()
+
+# Parsed results keyed by model + prompt; repeated requests skip the provider
+RESPONSE_CACHE = ResponseCache()
+# Opt-in near-duplicate lookup for `/e` requests (BASHBARD_SEMANTIC_CACHE=1)
+_SEMANTIC_CACHE = SemanticCache()
 
 
-def _ensure_llm():
+def ensure_llm():
     global _LLM
-    if _LLM is None:
-        _LLM = get_llm()
-    return _LLM
+    llm = _LLM
+    if llm is None:
+        # Racing pool workers / daemon threads must not build two clients
+        with _LLM_LOCK:
+            if _LLM is None:
+                _LLM = get_llm()
+            llm = _LLM
+    return llm
+
+
+def warm_llm(on_error=None) -> None:
+    """Build the LLM client on a background thread so the first request finds it ready."""
+    def _warm() -> None:
+        try:
+            ensure_llm()
+        except Exception as e:
+            if on_error is not None:
+                on_error(e)
+
+    threading.Thread(target=_warm, name="llm-warmup", daemon=True).start()
+
+
+# Stream completions and stop reading once the JSON object is complete (BASHBARD_STREAM=0 to disable)
+_STREAM_RESPONSES = os.getenv("BASHBARD_STREAM", "1") != "0"
+
+
+# Only these characters can change the scanner's state
+_JSON_SPECIAL_RE = re.compile(r'[{}"\\]')
+
+
+class _JsonObjectScanner:
+    """Incrementally track brace depth to spot the end of the first top-level JSON object."""
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, text: str) -> bool:
+        # Jump between structural characters instead of looping per character
+        skip = 0
+        if self.escape:
+            self.escape = False
+            skip = 1
+        for m in _JSON_SPECIAL_RE.finditer(text, skip):
+            i = m.start()
+            if i < skip:
+                continue
+            ch = text[i]
+            if self.in_string:
+                if ch == "\\":
+                    # The escaped character may arrive in the next chunk
+                    if i + 1 == len(text):
+                        self.escape = True
+                    skip = i + 2
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                if self.started:
+                    self.in_string = True
+            elif ch == "{":
+                self.started = True
+                self.depth += 1
+            elif ch == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
+def _chunk_text(chunk) -> str:
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(p if isinstance(p, str) else str(p.get("text", "")) for p in content if isinstance(p, (str, dict)))
+    return str(content)
+
+
+def _stream_json_response(llm, prompt: str) -> str:
+    """Read streamed chunks until the first JSON object closes, then drop the stream."""
+    scanner = _JsonObjectScanner()
+    parts = []
+    stream = llm.stream(prompt)
+    try:
+        for chunk in stream:
+            text = _chunk_text(chunk)
+            parts.append(text)
+            if scanner.feed(text):
+                break
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    return "".join(parts)
 
 
-def _llm_invoke_with_timeout(llm, prompt: str, timeout_seconds: int = 30):
+_LLM_POOL = None
+_LLM_POOL_LOCK = threading.Lock()
+
+
+def llm_pool() -> ThreadPoolExecutor:
+    # Shared across calls so an invocation doesn't pay for thread startup, and
+    # a timed-out call isn't joined on the way out
+    global _LLM_POOL
+    if _LLM_POOL is None:
+        with _LLM_POOL_LOCK:
+            if _LLM_POOL is None:
+                _LLM_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm")
+    return _LLM_POOL
+
+
+def _llm_call(llm):
+    if _STREAM_RESPONSES and hasattr(llm, "stream"):
+        # Returns the raw text; callers read getattr(msg, "content", str(msg))
+        return functools.partial(_stream_json_response, llm)
+    return llm.invoke
+
+
+def _announce_llm(timeout_seconds: int) -> None:
     # Ensure this starts on a fresh line for better UX when used in PTY
     print(f"\n{label('LLM')} Contacting provider... {warn(f'(timeout {timeout_seconds}s)')}")
-    with ThreadPoolExecutor(max_workers=1) as pool:
-        future = pool.submit(llm.invoke, prompt)
-        try:
-            return future.result(timeout=timeout_seconds)
-        except FuturesTimeoutError as exc:
-            raise TimeoutError("LLM request timed out") from exc
+
+
+def _llm_invoke_with_timeout(llm, prompt: str, timeout_seconds: int = 30):
+    _announce_llm(timeout_seconds)
+    future = llm_pool().submit(_llm_call(llm), prompt)
+    try:
+        return future.result(timeout=timeout_seconds)
+    except FuturesTimeoutError as exc:
+        future.cancel()
+        raise TimeoutError("LLM request timed out") from exc
 
 
 def route(state: State):
@@ -43,93 +175,188 @@ def route(state: State):
     raise ValueError("Provide either --english or --fix with --cmd and --err")
 
 
+# Opening code fence line, e.g. ```json
+_FENCE_OPEN_RE = re.compile(r"```[^\n]*\n?")
+
+
 def _parse_llm_json(content: str) -> Dict[str, str]:
-    text = content.strip()
-    if text.startswith("```"):
-        lines = text.splitlines()
-        body = "\n".join(lines[1:])
-        if body.rstrip().endswith("```"):
-            body = body.rstrip()[:-3]
-        text = body.strip()
+    # Most replies are already clean JSON; only clean up fences when that fails
     try:
-        return json.loads(text)
+        return wire.loads(content)
     except Exception:
+        pass
+    text = content.strip()
+    if text.startswith("```"):
+        text = text[_FENCE_OPEN_RE.match(text).end():].rstrip()
+        if text.endswith("```"):
+            text = text[:-3]
+        text = text.strip()
         try:
-            start = text.index('{')
-            end = text.rindex('}') + 1
-            return json.loads(text[start:end])
+            return wire.loads(text)
         except Exception:
-            return {"command": text, "explanation": "Model returned plain text; review carefully.", "mode": "run"}
+            pass
+    try:
+        start = text.index('{')
+        end = text.rindex('}') + 1
+        return wire.loads(text[start:end])
+    except Exception:
+        return {"command": text, "explanation": "Model returned plain text; review carefully.", "mode": "run"}
 
 
-def from_english(state: State) -> State:
-    llm = _ensure_llm()
-    strict = bool(state.get("strict_json"))
-    base_prompt = (
-        "You are a Linux shell expert. Convert the user's natural-language request into a single, safe (if possible), POSIX-compatible command when possible.\n"
-        "If the command is dangerous, return the command and explanation; a separate danger check will assess it before running.\n"
-        "Return ONLY JSON with keys: command, explanation, mode. NO prose, NO code fences.\n"
-        "If no safe/runnable command is appropriate, set mode to 'explain' and put your guidance in 'explanation' and leave 'command' empty.\n"
-        f"Request: {state['user_request']}"
-    )
-    prompts = [base_prompt]
-    if strict:
-        prompts.append(base_prompt + "\nRespond STRICTLY in JSON. No extra text. Schema: {\"command\": string, \"explanation\": string, \"mode\": \"run\"|\"explain\"}.")
+_STRICT_SUFFIX = "\nRespond STRICTLY in JSON. No extra text. Schema: {\"command\": string, \"explanation\": string, \"mode\": \"run\"|\"explain\"}."
 
-    last_exc = None
-    for p in prompts:
-        try:
-            msg = _llm_invoke_with_timeout(llm, p)
-        except Exception as e:
-            last_exc = e
-            continue
-        data = _parse_llm_json(getattr(msg, "content", str(msg)))
-        # If parser fell back to "plain text" message, retry if strict
-        if strict and (data.get("explanation", "").lower().startswith("model returned plain text")):
-            continue
-        mode = (data.get("mode") or "run").strip().lower()
-        return {"candidate_command": data.get("command", ""), "candidate_explanation": data.get("explanation", ""), "candidate_mode": mode}
-    # All attempts failed
-    if last_exc is not None:
-        return {"candidate_command": "", "candidate_explanation": f"LLM error: {last_exc}", "candidate_mode": "explain"}
-    return {"candidate_command": "", "candidate_explanation": "", "candidate_mode": "explain"}
 
+# Static instruction blocks; each prompt is one of these plus the per-request fields,
+# so every request shares an identical leading prefix
+_ENGLISH_INSTRUCTIONS = (
+    "You are a Linux shell expert. Convert the user's natural-language request into a single, safe (if possible), POSIX-compatible command when possible.\n"
+    "If the command is dangerous, return the command and explanation; a separate danger check will assess it before running.\n"
+    "Return ONLY JSON with keys: command, explanation, mode. NO prose, NO code fences.\n"
+    "If no safe/runnable command is appropriate, set mode to 'explain' and put your guidance in 'explanation' and leave 'command' empty.\n"
+)
+_ERROR_INSTRUCTIONS = (
+    "You are a Linux CLI fixer. Given a command that failed and its error output, propose a corrected command.\n"
+    "Assume a typical Debian/Ubuntu environment unless specified.\n"
+    "If the intent is ambiguous, choose the most likely command.\n"
+    "Return ONLY JSON: {command, explanation, mode}. NO prose, NO code fences.\n"
+    "If the best action is to explain instead of running anything (e.g., user typed a non-existent command or must supply operands), set mode to 'explain' and leave 'command' empty.\n\n"
+)
+_REPLAN_INSTRUCTIONS = (
+    "Rewrite the following shell command to satisfy the user's feedback while minimizing risk.\n"
+    "Prefer read-only or non-destructive forms. If write action is required, add the smallest scope and backup/--dry-run flags where available.\n"
+    "Return JSON: {command, explanation}.\n\n"
+)
 
-def from_error(state: State) -> State:
-    llm = _ensure_llm()
+
+def _normalize_request(text: str) -> str:
+    # Requests that differ only in spacing share one prompt (and cache key). Case is
+    # kept: it can matter for file names and patterns.
+    return " ".join(text.split())
+
+
+def english_prompt(state: State) -> str:
+    return f"{_ENGLISH_INSTRUCTIONS}Request: {_normalize_request(state['user_request'])}"
+
+
+def error_prompt(state: State) -> str:
     intent = state.get("user_request", "")
-    strict = bool(state.get("strict_json"))
-    base_prompt = (
-        "You are a Linux CLI fixer. Given a command that failed and its error output, propose a corrected command.\n"
-        "Assume a typical Debian/Ubuntu environment unless specified.\n"
-        "If the intent is ambiguous, choose the most likely command.\n"
-        "Return ONLY JSON: {command, explanation, mode}. NO prose, NO code fences.\n"
-        "If the best action is to explain instead of running anything (e.g., user typed a non-existent command or must supply operands), set mode to 'explain' and leave 'command' empty.\n\n"
+    return (
+        f"{_ERROR_INSTRUCTIONS}"
         f"Intent (optional): {intent}\n"
         f"Command: {state['last_command']}\n"
         f"Error: {state['last_error']}\n"
     )
-    prompts = [base_prompt]
-    if strict:
-        prompts.append(base_prompt + "\nRespond STRICTLY in JSON. No extra text. Schema: {\"command\": string, \"explanation\": string, \"mode\": \"run\"|\"explain\"}.")
 
+
+def _is_plain_text_fallback(data: Dict[str, str]) -> bool:
+    return data.get("explanation", "").lower().startswith("model returned plain text")
+
+
+def cacheable_candidate(out: State) -> bool:
+    """True for a parsed JSON reply worth replaying from the response cache.
+
+    A plain-text fallback isn't: the cache key leaves out strictness, so caching
+    one would hand it to strict callers instead of letting them retry.
+    """
+    if not (out.get("candidate_command") or out.get("candidate_explanation")):
+        return False
+    return not _is_plain_text_fallback({"explanation": out.get("candidate_explanation", "")})
+
+
+def _candidate_from_data(data: Dict[str, str]) -> State:
+    mode = (data.get("mode") or "run").strip().lower()
+    return {"candidate_command": data.get("command", ""), "candidate_explanation": data.get("explanation", ""), "candidate_mode": mode}
+
+
+def candidate_from_message(msg) -> State:
+    return _candidate_from_data(_parse_llm_json(getattr(msg, "content", str(msg))))
+
+
+def llm_error_candidate(exc: BaseException) -> State:
+    return {"candidate_command": "", "candidate_explanation": f"LLM error: {exc}", "candidate_mode": "explain"}
+
+
+def _generate_candidate(prompt: str, strict: bool) -> State:
+    llm = ensure_llm()
+    key = cache_key(llm, prompt)
+    cached = RESPONSE_CACHE.get(key)
+    if cached is not None:
+        return cached
+    # Failures raise out of here, so an "LLM error: ..." never reaches the cache
+    try:
+        if strict and _strict_only(llm):
+            out = candidate_from_message(_llm_invoke_with_timeout(llm, prompt + _STRICT_SUFFIX))
+        elif strict:
+            out = _race_strict(llm, prompt)
+        else:
+            out = candidate_from_message(_llm_invoke_with_timeout(llm, prompt))
+    except Exception as e:
+        return llm_error_candidate(e)
+    if cacheable_candidate(out):
+        RESPONSE_CACHE.set(key, out)
+    return out
+
+
+def _strict_only(llm) -> bool:
+    # OpenAI-compatible endpoints (OpenAI, vLLM, llama.cpp server) follow the strict
+    # suffix well enough that racing the base prompt alongside only doubles the tokens
+    return type(llm).__name__ == "ChatOpenAI"
+
+
+def _race_strict(llm, prompt: str, timeout_seconds: int = 30) -> State:
+    """Send the base and strict prompts together; take the first real JSON reply.
+
+    Raises the last error when every attempt failed or the deadline passed.
+    """
+    _announce_llm(timeout_seconds)
+    call = _llm_call(llm)
+    pool = llm_pool()
+    pending = {pool.submit(call, prompt), pool.submit(call, prompt + _STRICT_SUFFIX)}
+    deadline = time.monotonic() + timeout_seconds
     last_exc = None
-    for p in prompts:
-        try:
-            msg = _llm_invoke_with_timeout(llm, p)
-        except Exception as e:
-            last_exc = e
-            continue
-        data = _parse_llm_json(getattr(msg, "content", str(msg)))
-        if strict and (data.get("explanation", "").lower().startswith("model returned plain text")):
-            continue
-        mode = (data.get("mode") or "run").strip().lower()
-        return {"candidate_command": data.get("command", ""), "candidate_explanation": data.get("explanation", ""), "candidate_mode": mode}
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                last_exc = TimeoutError("LLM request timed out")
+                break
+            for future in done:
+                try:
+                    msg = future.result()
+                except Exception as e:
+                    last_exc = e
+                    continue
+                data = _parse_llm_json(getattr(msg, "content", str(msg)))
+                # A plain-text fallback doesn't count; keep waiting on the other prompt
+                if not _is_plain_text_fallback(data):
+                    return _candidate_from_data(data)
+    finally:
+        for future in pending:
+            future.cancel()
+    # All attempts failed
     if last_exc is not None:
-        return {"candidate_command": "", "candidate_explanation": f"LLM error: {last_exc}", "candidate_mode": "explain"}
+        raise last_exc
     return {"candidate_command": "", "candidate_explanation": "", "candidate_mode": "explain"}
 
 
+def from_english(state: State) -> State:
+    request = _normalize_request(state.get("user_request") or "")
+    llm = ensure_llm()
+    cached = _SEMANTIC_CACHE.get(llm, request)
+    # Embeddings put opposites close together ("delete the logs" / "keep the logs"),
+    # so a near-duplicate never stands in for a destructive command
+    if cached is not None and not danger_reasons(cached.get("candidate_command", "")):
+        return cached
+    out = _generate_candidate(english_prompt(state), bool(state.get("strict_json")))
+    if out.get("candidate_command"):
+        _SEMANTIC_CACHE.set(llm, request, out)
+    return out
+
+
+def from_error(state: State) -> State:
+    return _generate_candidate(error_prompt(state), bool(state.get("strict_json")))
+
+
 def from_direct(state: State) -> State:
     # Pass through a directly-entered shell command
     cmd = state.get("direct_command", "").strip()
@@ -138,30 +365,43 @@ def from_direct(state: State) -> State:
     return {"candidate_command": cmd, "candidate_explanation": "Direct command", "candidate_mode": "run", "source": "direct"}
 
 
+_INTENT_KEYWORDS = (
+    "delete the root", "rm -rf /", "wipe disk", "format /", "destroy all", "erase all",
+    "drop database", "remove all files", "shred", "mkfs", "reboot", "shutdown",
+)
+
+# Single-pass scans instead of one substring search per keyword
+_INTENT_RE = re.compile("|".join(map(re.escape, _INTENT_KEYWORDS)), re.IGNORECASE)
+_EXPL_RE = re.compile("dangerous|warning|destructive", re.IGNORECASE)
+
+
 def danger_check(state: State) -> State:
     # Base check on the actual command
-    out = check_danger(state["candidate_command"]) if state.get("candidate_command") else {"danger": True, "reasons": ["No command generated"]}
+    if state.get("candidate_command"):
+        base_reasons = danger_reasons(state["candidate_command"])
+        is_danger = bool(base_reasons)
+    else:
+        is_danger, base_reasons = True, ("No command generated",)
 
     # Augment with intent/explanation signals (prompt even if LLM "simulates" with echo)
-    reasons = list(out["reasons"]) if isinstance(out.get("reasons"), list) else []
-    is_danger = bool(out["danger"])
-
-    req = (state.get("user_request") or "").lower()
-    expl = (state.get("candidate_explanation") or "").lower()
-    intent_keywords = [
-        "delete the root", "rm -rf /", "wipe disk", "format /", "destroy all", "erase all",
-        "drop database", "remove all files", "shred", "mkfs", "reboot", "shutdown",
-    ]
-    if any(k in req for k in intent_keywords):
+    reasons = list(base_reasons)
+
+    req = state.get("user_request") or ""
+    expl = state.get("candidate_explanation") or ""
+    if _INTENT_RE.search(req):
         is_danger = True
         reasons.append("User intent appears destructive")
-    if ("dangerous" in expl) or ("warning" in expl) or ("destructive" in expl):
+    if _EXPL_RE.search(expl):
         is_danger = True
         reasons.append("Explanation indicates danger")
 
     return {"danger": is_danger, "danger_reasons": reasons}
 
 
+# A <name>-style placeholder; plain redirections like `sort < in > out` don't match
+_PLACEHOLDER_RE = re.compile(r"<[^<>\s]+>")
+
+
 def approval_gate(state: State) -> State:
     # Bypass approval for direct commands entered by the user
     if state.get("source") == "direct":
@@ -171,26 +411,25 @@ def approval_gate(state: State) -> State:
         return {"approval": "cancelled"}
     # Heuristic: if the command includes placeholders like <directory_name>, do not run
     cmd_text = (state.get("candidate_command") or "").strip()
-    if cmd_text and ("<" in cmd_text and ">" in cmd_text):
+    if cmd_text and _PLACEHOLDER_RE.search(cmd_text):
         expl = state.get("candidate_explanation") or "The proposed command includes placeholders (e.g., <...>). Replace them with real values and run again."
         return {"approval": "cancelled", "candidate_mode": "explain", "candidate_explanation": expl}
     # Unified prompt for all commands: show candidate and ask for confirmation
-    is_dangerous = bool(state.get("danger"))
-    if is_dangerous:
-        
-        print(f"\n{header('DANGEROUS COMMAND','danger')}")
-        print(code(f"$ {state['candidate_command']}"))
-        if state.get("candidate_explanation"):
-            print(f"↳ {state['candidate_explanation']}")
-    else:
+    expl = state.get("candidate_explanation")
+    if not state.get("danger"):
         # Safe command: show explanation then auto-run
-        if state.get("candidate_explanation") and not state.get("quiet"):
+        if expl and not state.get("quiet"):
             print(f"\nCommand: {code('$ ' + state['candidate_command'])}")
-            print(f"↳ {state['candidate_explanation']}")
+            print(f"↳ {expl}")
         return {"approval": "auto"}
-    if is_dangerous and state.get("danger_reasons"):
+    print(f"\n{header('DANGEROUS COMMAND','danger')}")
+    print(code(f"$ {state['candidate_command']}"))
+    if expl:
+        print(f"↳ {expl}")
+    reasons = state.get("danger_reasons")
+    if reasons:
         print(warn("Reasons:"))
-        for r in state.get("danger_reasons", []):
+        for r in reasons:
             print(f" - {r}")
     ans = input("Run this command? [y/N] (y to run, n to cancel, e to replan): ").strip().lower()
     if ans in ("y", "yes"):
@@ -204,21 +443,88 @@ def approval_gate(state: State) -> State:
 
 
 def replan(state: State) -> State:
-    llm = _ensure_llm()
+    llm = ensure_llm()
     feedback = state.get("user_feedback", "Safer alternative")
     prompt = (
-        "Rewrite the following shell command to satisfy the user's feedback while minimizing risk.\n"
-        "Prefer read-only or non-destructive forms. If write action is required, add the smallest scope and backup/--dry-run flags where available.\n"
-        "Return JSON: {command, explanation}.\n\n"
+        f"{_REPLAN_INSTRUCTIONS}"
         f"Original: {state.get('candidate_command','')}\n"
         f"Feedback: {feedback}\n"
     )
+    key = cache_key(llm, prompt)
+    cached = RESPONSE_CACHE.get(key)
+    if cached is not None:
+        return cached
     try:
         msg = _llm_invoke_with_timeout(llm, prompt)
     except Exception as e:
         return {"candidate_command": "", "candidate_explanation": f"LLM error: {e}"}
     data = _parse_llm_json(getattr(msg, "content", str(msg)))
-    return {"candidate_command": data.get("command", ""), "candidate_explanation": data.get("explanation", "")}
+    out = {"candidate_command": data.get("command", ""), "candidate_explanation": data.get("explanation", "")}
+    if out["candidate_command"] and cacheable_candidate(out):
+        RESPONSE_CACHE.set(key, out)
+    return out
+
+
+# Only the most recent bytes of each stream are kept for the result/fixer prompt
+_OUTPUT_TAIL_BYTES = 64 * 1024
+# Exit status for a command stopped with Ctrl-C (128 + SIGINT, as the shell reports it)
+INTERRUPTED_EXIT_CODE = 130
+
+
+def _echo(stream, chunk: bytes) -> None:
+    buf = getattr(stream, "buffer", None)
+    if buf is not None:
+        buf.write(chunk)
+    else:
+        stream.write(chunk.decode("utf-8", "replace"))
+    stream.flush()
+
+
+def _stream_command(cmd: str, echo: bool) -> Tuple[int, str, str]:
+    """Run cmd, forwarding output as it arrives and returning (exit_code, stdout_tail, stderr_tail)."""
+    sys.stdout.flush()
+    proc = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out_tail = bytearray()
+    err_tail = bytearray()
+    streams = {
+        proc.stdout.fileno(): (sys.stdout, out_tail),
+        proc.stderr.fileno(): (sys.stderr, err_tail),
+    }
+    interrupted = False
+    try:
+        with selectors.DefaultSelector() as sel:
+            sel.register(proc.stdout, selectors.EVENT_READ)
+            sel.register(proc.stderr, selectors.EVENT_READ)
+            while sel.get_map():
+                for key, _mask in sel.select():
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        sel.unregister(key.fileobj)
+                        continue
+                    sink, tail = streams[key.fd]
+                    if echo:
+                        _echo(sink, chunk)
+                    tail += chunk
+                    if len(tail) > _OUTPUT_TAIL_BYTES:
+                        del tail[:-_OUTPUT_TAIL_BYTES]
+        proc.wait()
+    except KeyboardInterrupt:
+        # Ctrl-C stops the command and returns what it printed so far, rather
+        # than unwinding the graph with the child still attached to our pipes
+        if proc.poll() is None:
+            proc.terminate()
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        err_tail += b"\n(interrupted)"
+        interrupted = True
+    finally:
+        proc.stdout.close()
+        proc.stderr.close()
+    exit_code = INTERRUPTED_EXIT_CODE if interrupted else proc.returncode
+    return exit_code, out_tail.decode("utf-8", "replace"), err_tail.decode("utf-8", "replace")
 
 
 def run_command(state: State) -> State:
@@ -226,20 +532,18 @@ def run_command(state: State) -> State:
     if not cmd:
         return {"result": {"exit_code": 1, "stdout": "", "stderr": "No command to run."}}
 
-    dry = state.get("dry_run") is True if state.get("dry_run") is not None else (os.getenv("DRY_RUN", "1") == "1")
+    dry_run = state.get("dry_run")
+    dry = dry_run is True if dry_run is not None else (os.getenv("DRY_RUN", "1") == "1")
     if dry:
         print(f"\r\n{label('DRY-RUN','muted')} Would execute: {code('$ ' + cmd)}")
         return {"result": {"exit_code": 0, "stdout": "(dry-run) not executed", "stderr": ""}}
 
     print(f"\r\n{label('RUN')} {code('$ ' + cmd)}")
-    proc = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    res: Dict[str, object] = {"exit_code": proc.returncode, "stdout": proc.stdout, "stderr": proc.stderr}
-    if not state.get("quiet"):
-        print("-- stdout --\n" + (proc.stdout or ""))
-        if proc.stderr:
-            print("-- stderr --\n" + proc.stderr)
-    if proc.returncode != 0:
-        return {"result": res, "last_command": cmd, "last_error": proc.stderr or "(no stderr captured)"}
+    exit_code, stdout, stderr = _stream_command(cmd, echo=not state.get("quiet"))
+    res: Dict[str, object] = {"exit_code": exit_code, "stdout": stdout, "stderr": stderr}
+    # The user stopped it on purpose; there's no error for the fixer to look at
+    if exit_code != 0 and exit_code != INTERRUPTED_EXIT_CODE:
+        return {"result": res, "last_command": cmd, "last_error": stderr or "(no stderr captured)"}
     return {"result": res}
 
 
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
+import functools
 import re
-import shlex
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 
 DANGEROUS_PATTERNS: List[tuple[str, str]] = [
@@ -22,6 +22,19 @@ DANGEROUS_PATTERNS: List[tuple[str, str]] = [
 ]
 
 
+# Compiled once at import instead of going through re's pattern cache per call.
+# re.ASCII: the patterns are ASCII and bash only splits on ASCII whitespace, so
+# \b/\w/\s skip the Unicode tables without changing what a shell would see.
+_COMPILED_PATTERNS = [(re.compile(pattern, re.ASCII), label) for pattern, label in DANGEROUS_PATTERNS]
+
+# One alternation over every pattern: benign commands (the common case) are
+# cleared in a single scan. Matches can overlap, so a hit still falls back to
+# the per-pattern loop to collect every label.
+_ANY_DANGER = re.compile("|".join(f"(?:{pattern})" for pattern, _ in DANGEROUS_PATTERNS), re.ASCII)
+
+_REDIR_RE = re.compile(r">\s*/(etc|boot|bin|sbin|usr)/", re.ASCII)
+
+
 ALLOWED_PREFIXES = [
     "ls",
     "cat",
@@ -55,21 +68,31 @@ ALLOWED_PREFIXES = [
     "ss",
 ]
 
+_ALLOWED = frozenset(ALLOWED_PREFIXES)
 
-def check_danger(cmd: str) -> Dict:
+
+@functools.lru_cache(maxsize=1024)
+def danger_reasons(cmd: str) -> Tuple[str, ...]:
+    """Memoized core of check_danger; repeat checks of a command skip every scan."""
     reasons: List[str] = []
     stripped = cmd.strip()
-    for pattern, label in DANGEROUS_PATTERNS:
-        if re.search(pattern, stripped):
-            reasons.append(label)
+    if _ANY_DANGER.search(stripped):
+        for regex, label in _COMPILED_PATTERNS:
+            if regex.search(stripped):
+                reasons.append(label)
 
-    first = shlex.split(stripped)[0] if stripped else ""
-    if "sudo" in stripped and first not in ALLOWED_PREFIXES:
-        reasons.append("Uses sudo on non-allowlisted command")
+    if "sudo" in stripped:
+        # Only the command name is needed, so skip shlex's full tokenization
+        first = stripped.split(None, 1)[0]
+        if first not in _ALLOWED:
+            reasons.append("Uses sudo on non-allowlisted command")
 
-    if re.search(r">\s*/(etc|boot|bin|sbin|usr)/", stripped):
+    if _REDIR_RE.search(stripped):
         reasons.append("Redirection into system path")
 
-    return {"danger": len(reasons) > 0, "reasons": reasons}
+    return tuple(reasons)
 
 
+def check_danger(cmd: str) -> Dict:
+    reasons = danger_reasons(cmd)
+    return {"danger": len(reasons) > 0, "reasons": list(reasons)}
@@ -8,6 +8,7 @@ AI Terminal Shim — PTY-based terminal with LangGraph integration
 - Integrates with existing LangGraph nodes for command processing
 """
 
+import errno
 import os
 import pty
 import sys
@@ -16,21 +17,117 @@ import termios
 import fcntl
 import struct
 import signal
-import select
+import selectors
 import subprocess
-from typing import Optional, Dict, Tuple
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Optional, Dict, Tuple
 import re
+import hashlib
+import shlex
+import tempfile
 
-from .graph import build_graph
 from .state import State
 from .safety import check_danger
-from .nodes import replan as llm_replan, from_english as llm_from_english, from_error as llm_from_error
-from .llm import get_llm
-from .ux import label, header, code, warn, error as color_error, success, dim
+from .ux import label, header, code, warn, error as color_error, success, dim, refresh_term_width
 
 
 # Configure bash command
 BASH = ["bash", "--noprofile", "--norc"]   # Use ["bash", "-l"] if you want rc files
+# bash reports each exit code to a FIFO in a private temp dir instead of printing a
+# marker. PROMPT_COMMAND reopens it by path for every prompt, so no descriptor is
+# left open in the shell for user commands and subshells to inherit or clobber.
+_STATUS_FIFO_NAME = "status"
+
+_QUIT_COMMANDS = frozenset(("/q", "/quit", "/exit"))
+
+# Drain whatever the PTY has buffered per wakeup, so bulk output costs fewer reads
+_PTY_READ_SIZE = 65536
+# Keystrokes are read in chunks too: a paste is one read, not one per byte
+_STDIN_READ_SIZE = 4096
+
+# Keystroke classes, looked up per byte in a 256-entry table instead of a chain
+# of comparisons; anything not listed is a plain key forwarded as-is
+_KEY_PLAIN, _KEY_SIGNAL, _KEY_ERASE, _KEY_ENTER = range(4)
+_KEY_SIGNALS = {0x03: signal.SIGINT, 0x1A: signal.SIGTSTP, 0x1C: signal.SIGQUIT}  # ^C ^Z ^\
+_KEY_KIND = bytearray(256)
+for _b in _KEY_SIGNALS:
+    _KEY_KIND[_b] = _KEY_SIGNAL
+_KEY_KIND[0x7F] = _KEY_KIND[0x08] = _KEY_ERASE  # Backspace, Del
+_KEY_KIND[0x0D] = _KEY_KIND[0x0A] = _KEY_ENTER
+del _b
+_SLASH = ord("/")
+# A run of plain keys (most of any paste) is consumed with one C-level match
+_PLAIN_KEYS_RE = re.compile(rb"[^\x03\x1a\x1c\x7f\x08\r\n]+")
+
+# Burst output is coalesced into one stdout write per 16 KiB or 8 ms; small
+# reads (keystroke echo, prompts) and status markers are written immediately
+_OUT_FLUSH_BYTES = 16 * 1024
+_OUT_FLUSH_DELAY = 0.008
+_OUT_SMALL_READ = 512
+_STATUS_MARKER = b"[[AI:STATUS:"
+
+# One C-level scan over raw bytes decides whether a chunk needs line-by-line
+# inspection; plain output (the vast majority) is just kept as context
+_MARKER_RE = re.compile(rb"\[\[AI:STATUS:|(?i:command not found)")
+_NOT_FOUND_MARKER_RE = re.compile(rb"(?i:command not found)")
+_STATUS_LINE_RE = re.compile(rb"\[\[AI:STATUS:(.*)\]\]", re.DOTALL)
+_EOL_RE = re.compile(rb"[\r\n]")
+_CARRY_LIMIT = 4096
+
+# Fixed bytes written on every install / slash command, encoded once at import
+# (ux decides on color at import time too)
+_PROMPT_COMMAND_INLINE = b"export PROMPT_COMMAND='printf \"\\n[[AI:STATUS:%d]]\\n\" $?;'\n"
+_HELP_TEXT = (
+    f"\r\n{header('BashBard Commands')}\r\n"
+    f"  {code('/e <request>')}   Convert natural language to command\r\n"
+    f"  {code('/repair on')}     Enable auto-repair (interactive approval)\r\n"
+    f"  {code('/repair auto')}   Enable auto-repair and auto-run fixes\r\n"
+    f"  {code('/repair off')}    Disable auto-repair (default)\r\n"
+    f"  {code('/dry on')}        Enable dry-run mode\r\n"
+    f"  {code('/dry off')}       Disable dry-run mode\r\n"
+    f"  {code('/help')}          Show this help\r\n"
+    f"  {code('/quit')}          Exit terminal\r\n\r\n"
+).encode()
+_REPAIR_ON_MSG = f"\r\n{label('Repair','success')} Auto-repair enabled with interactive approval\r\n".encode()
+_REPAIR_AUTO_MSG = f"\r\n{label('Repair','success')} Auto-repair enabled: auto-run fixes\r\n".encode()
+_REPAIR_OFF_MSG = f"\r\n{label('Repair','muted')} Auto-repair disabled\r\n".encode()
+_REPAIR_USAGE_MSG = f"\r\n{label('Usage','muted')} /repair [on|interactive|auto|off]\r\n".encode()
+
+# The LLM nodes (and, through them, the provider SDK) load on first use so the
+# shell comes up without waiting on them
+_nodes = None
+
+
+def _get_nodes():
+    global _nodes
+    if _nodes is None:
+        from . import nodes as _nodes
+    return _nodes
+
+
+_CMD_JSON_RE = re.compile(r'"command"\s*:\s*"(.*?)"', re.DOTALL)
+
+# The line that says what went wrong; the rest of the output varies run to run
+_ERROR_SIG_RE = re.compile(
+    r"[^\n]*(?:command not found|no such file or directory|permission denied|error|invalid|unrecognized)[^\n]*",
+    re.IGNORECASE,
+)
+_LRU_LIMIT = 256
+
+
+def _lru_put(cache: "OrderedDict", key, value) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > _LRU_LIMIT:
+        cache.popitem(last=False)
+
+
+def _error_signature(error_text: str) -> str:
+    m = _ERROR_SIG_RE.search(error_text)
+    basis = m.group(0).strip() if m else error_text[:256]
+    return hashlib.blake2b(basis.encode("utf-8", "replace"), digest_size=8).hexdigest()
 
 
 # ----------------------------
@@ -49,7 +146,7 @@ def _sanitize_llm_command_text(text: str) -> Optional[str]:
     candidate = text.strip()
     # If we accidentally got a JSON-ish blob, try to extract command value
     if '"command"' in candidate or candidate.startswith('{'):
-        m = re.search(r'"command"\s*:\s*"(.*?)"', candidate, re.DOTALL)
+        m = _CMD_JSON_RE.search(candidate)
         if m:
             extracted = m.group(1).strip()
             # Collapse whitespace/newlines inside extracted
@@ -69,7 +166,7 @@ def english_to_command_if_needed(user_line: str, *, cwd: str, env: dict) -> str:
     """
     try:
         state: State = {"user_request": user_line, "dry_run": False, "quiet": True, "strict_json": True}
-        result = llm_from_english(state)
+        result = _get_nodes().from_english(state)
         raw_cmd = result.get("candidate_command", "")
         mode = (result.get("candidate_mode") or "run").lower()
         if raw_cmd and mode != "explain":
@@ -104,7 +201,7 @@ def repair_command_if_needed(prev_cmd: str, last_output_chunk: str, *, cwd: str,
             "quiet": True,
             "strict_json": True,
         }
-        result = llm_from_error(state)
+        result = _get_nodes().from_error(state)
         raw_cmd = result.get("candidate_command", "")
         mode = (result.get("candidate_mode") or "run").lower()
         if raw_cmd and mode != "explain":
@@ -123,13 +220,19 @@ def repair_command_if_needed(prev_cmd: str, last_output_chunk: str, *, cwd: str,
         return None
 
 
-def approval_gate(cmd: str, *, context: str) -> bool:
+def _read_stdin_byte() -> bytes:
+    return os.read(sys.stdin.fileno(), 1)
+
+
+def approval_gate(cmd: str, *, context: str, read_byte=_read_stdin_byte, danger: Optional[Future] = None) -> bool:
     """
     Risk check + human approval using the existing danger_check function.
+
+    `danger` may be a future already running check_danger(cmd) on a worker.
     """
     try:
         # Use the existing danger check
-        danger_result = check_danger(cmd)
+        danger_result = danger.result() if danger is not None else check_danger(cmd)
         is_dangerous = danger_result.get("danger", False)
         reasons = danger_result.get("reasons", [])
         
@@ -145,19 +248,24 @@ def approval_gate(cmd: str, *, context: str) -> bool:
             sys.stdout.flush()
             
             # Read user response in raw mode
-            response = ""
+            response = bytearray()
             while True:
-                ch = os.read(sys.stdin.fileno(), 1)
-                if ch in (b"\r", b"\n"):
+                ch = read_byte()
+                if ch in (b"\r", b"\n", b""):
                     print("\r\n", end="")
                     break
                 if ch == b"\x03":  # Ctrl-C
                     print("\r\n", end="")
                     return False
-                response += ch.decode("utf-8", "ignore")
+                if ch in (b"\x7f", b"\x08"):
+                    if response:
+                        del response[-1]
+                        os.write(sys.stdout.fileno(), b"\b \b")
+                    continue
+                response += ch
                 os.write(sys.stdout.fileno(), ch)
             
-            return response.lower() in ("y", "yes")
+            return response.decode("utf-8", "ignore").strip().lower() in ("y", "yes")
         
         # Safe command - auto-approve
         return True
@@ -170,6 +278,13 @@ def approval_gate(cmd: str, *, context: str) -> bool:
 # Terminal helpers
 # ----------------------------
 
+def _write_all(fd: int, data) -> None:
+    view = memoryview(data)
+    while view:
+        n = os.write(fd, view)
+        view = view[n:]
+
+
 def get_winsize(fd: int) -> Tuple[int, int]:
     try:
         s = fcntl.ioctl(fd, termios.TIOCGWINSZ, b"\x00" * 8)
@@ -192,13 +307,57 @@ def set_winsize(fd: int, rows: int, cols: int) -> None:
 # ----------------------------
 
 class AITerminal:
+    # Fixed attribute layout: the run loop and output path read these on every chunk
+    __slots__ = (
+        "child_pid", "master_fd", "orig_tattr", "line_buffer", "_stdin_pending", "_stdin_pos",
+        "_cwd", "_env", "_pool", "_recent_translations", "_repair_cache",
+        "_out_buf", "_flush_deadline", "_pty_out_queue", "_pty_write_armed", "_sel",
+        "_status_fd", "_status_path", "_status_buf", "_marker_re", "_carry", "_splice_pipe", "_splice_ok",
+        "max_context_lines", "_ring", "_bytes_seen", "_ring_text",
+        "last_failed_command", "last_error_text", "last_repair_suggestion",
+        "_pending_cmd", "_pending_output_start",
+        "_repair_in_progress", "_last_repaired_for_cmd", "_repair_attempts",
+        "dry_run", "quiet", "auto_repair", "interactive_repair", "_typing_special_command",
+    )
+
     def __init__(self, dry_run: bool = False, quiet: bool = False):
         self.child_pid: Optional[int] = None
         self.master_fd: Optional[int] = None
         self.orig_tattr = None
         self.line_buffer = bytearray()
-        self.last_output_lines: list[str] = []
+        # Read-ahead shared by the main loop and prompts; consumed by advancing _stdin_pos
+        self._stdin_pending = b""
+        self._stdin_pos = 0
+        # Our own process never chdirs or changes its environment, so snapshot both once
+        self._cwd = os.getcwd()
+        self._env = dict(os.environ)
+
+        # Background work that overlaps with provider calls (e.g. speculative safety checks)
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bashbard-term")
+        # Last translation per `/e` request; likely to come back again
+        self._recent_translations: "OrderedDict[str, str]" = OrderedDict()
+        # (failed command, error signature) -> suggested fix, so a repeated typo skips the LLM
+        self._repair_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._out_buf = bytearray()
+        # PTY input the child hasn't accepted yet, drained on EVENT_WRITE
+        self._pty_out_queue: Deque[bytes] = deque()
+        self._pty_write_armed = False
+        self._sel: Optional[selectors.BaseSelector] = None
+        # Our end of the exit-status FIFO; None falls back to inline [[AI:STATUS]] markers
+        self._status_fd: Optional[int] = None
+        self._status_path: Optional[str] = None
+        self._status_buf = bytearray()
+        self._marker_re = _MARKER_RE
+        self._carry = bytearray()  # unterminated tail of the last chunk, not yet scanned
+        # PTY -> pipe -> stdout passthrough for output nobody inspects; disabled on first failure
+        self._splice_pipe: Optional[Tuple[int, int]] = None
+        self._splice_ok = hasattr(os, "splice")
+        self._flush_deadline: Optional[float] = None
         self.max_context_lines = 100
+        # Raw PTY output in a fixed circular buffer; decoded only when context is needed
+        self._ring = bytearray(64 * 1024)
+        self._bytes_seen = 0  # total bytes ever appended; positions below are absolute
+        self._ring_text: Optional[str] = None
         
         # Error/repair context tracking
         self.last_failed_command: Optional[str] = None
@@ -223,19 +382,34 @@ class AITerminal:
         # Track if we're typing a special command that shouldn't go to bash
         self._typing_special_command = False
         
-        # Ensure LLM is available
-        try:
-            _ = get_llm()
-        except Exception as e:
-            print(f"Warning: LLM not available: {e}")
+        # Build the LLM client while the shell starts; report problems without blocking
+        self._pool.submit(
+            lambda: _get_nodes().warm_llm(on_error=lambda e: print(f"\r\nWarning: LLM not available: {e}\r"))
+        )
 
     # --- small raw-input helpers (work in raw mode) ---
 
+    def _read_stdin_byte(self) -> bytes:
+        # Prompts consume the same read-ahead as the main loop, so typed-ahead keys stay in order
+        if self._stdin_pos >= len(self._stdin_pending):
+            chunk = os.read(sys.stdin.fileno(), _STDIN_READ_SIZE)
+            if not chunk:
+                return b""
+            self._stdin_pending, self._stdin_pos = chunk, 0
+        pos = self._stdin_pos
+        self._stdin_pos = pos + 1
+        return self._stdin_pending[pos:pos + 1]
+
+    def _feed_stdin(self, chunk: bytes) -> None:
+        # Keep only the unread tail, so the buffer never grows by what was consumed
+        self._stdin_pending = self._stdin_pending[self._stdin_pos:] + chunk
+        self._stdin_pos = 0
+
     def _read_line_raw(self) -> str:
         buf = bytearray()
         while True:
-            ch = os.read(sys.stdin.fileno(), 1)
-            if ch in (b"\r", b"\n"):
+            ch = self._read_stdin_byte()
+            if ch in (b"\r", b"\n", b""):
                 print("\r\n", end="")
                 break
             if ch == b"\x03":  # Ctrl-C
@@ -285,6 +459,7 @@ class AITerminal:
     # --- child / pty
 
     def spawn_shell(self) -> None:
+        self._open_status_fifo()
         pid, mfd = pty.fork()
         if pid == 0:
             # Child
@@ -297,10 +472,35 @@ class AITerminal:
         # Parent
         self.child_pid = pid
         self.master_fd = mfd
+        # Writes never block the event loop; whatever the PTY won't take yet is queued
+        fcntl.fcntl(mfd, fcntl.F_SETFL, fcntl.fcntl(mfd, fcntl.F_GETFL) | os.O_NONBLOCK)
         # sync window size from our stdin
         r, c = get_winsize(sys.stdin.fileno())
         set_winsize(self.master_fd, r, c)
 
+    def _open_status_fifo(self) -> None:
+        try:
+            self._status_path = os.path.join(tempfile.mkdtemp(prefix="bashbard-"), _STATUS_FIFO_NAME)
+            os.mkfifo(self._status_path, 0o600)
+            # Read-write so the FIFO never reports EOF between prompts; os.open's
+            # descriptors aren't inheritable, so bash never sees this one
+            self._status_fd = os.open(self._status_path, os.O_RDWR | os.O_NONBLOCK)
+        except OSError:
+            self._remove_status_fifo()
+            return
+        # Statuses arrive out of band; PTY output is only scanned for 'command not found'
+        self._marker_re = _NOT_FOUND_MARKER_RE
+
+    def _remove_status_fifo(self) -> None:
+        if self._status_path is None:
+            return
+        for remove, path in ((os.unlink, self._status_path), (os.rmdir, os.path.dirname(self._status_path))):
+            try:
+                remove(path)
+            except OSError:
+                pass
+        self._status_path = None
+
     # --- TTY mode
 
     def enter_raw(self) -> None:
@@ -314,6 +514,7 @@ class AITerminal:
     # --- signals
 
     def on_sigwinch(self, *_):
+        refresh_term_width()
         if self.master_fd is None:
             return
         rows, cols = get_winsize(sys.stdin.fileno())
@@ -349,7 +550,7 @@ class AITerminal:
                 ctrl_map = {signal.SIGINT: b"\x03", signal.SIGTSTP: b"\x1a", signal.SIGQUIT: b"\x1c"}
                 ctrl = ctrl_map.get(sig)
                 if ctrl:
-                    os.write(self.master_fd, ctrl)
+                    self._pty_write(ctrl)
         except Exception:
             pass
 
@@ -365,8 +566,11 @@ class AITerminal:
         """
         if self.master_fd is None:
             return
-        setup = "export PROMPT_COMMAND='printf \"\\n[[AI:STATUS:%d]]\\n\" $?;'\n"
-        os.write(self.master_fd, setup.encode("utf-8"))
+        if self._status_fd is None:
+            self._pty_write(_PROMPT_COMMAND_INLINE)
+            return
+        prompt_command = f'printf "%d\\n" $? >{shlex.quote(self._status_path)};'
+        self._pty_write(f"export PROMPT_COMMAND={shlex.quote(prompt_command)}\n".encode())
 
     def _send_command_immediately(self, command: str) -> None:
         if not isinstance(command, str):
@@ -374,8 +578,7 @@ class AITerminal:
         if self.master_fd is None:
             return
         # Clear current readline buffer with Ctrl-U (clear line) and send command
-        os.write(self.master_fd, b"\x15")  # Ctrl-U clears the line
-        os.write(self.master_fd, (command + "\n").encode("utf-8"))
+        self._pty_write(b"\x15", (command + "\n").encode("utf-8"))  # Ctrl-U clears the line
 
     def _should_attempt_repair(self, command: str) -> bool:
         """
@@ -395,6 +598,8 @@ class AITerminal:
         """
         if not (self.last_failed_command and self.last_error_text):
             return
+        # Anything we print must come after the output that triggered it
+        self._flush_output()
             
         if not self.auto_repair:
             # Only show hint for repairable commands
@@ -418,12 +623,19 @@ class AITerminal:
             self._repair_attempts[self.last_failed_command] = \
                 self._repair_attempts.get(self.last_failed_command, 0) + 1
 
-            repaired = repair_command_if_needed(
-                prev_cmd=self.last_failed_command,
-                last_output_chunk=self.last_error_text,
-                cwd=os.getcwd(),
-                env=dict(os.environ),
-            )
+            repair_key = (self.last_failed_command, _error_signature(self.last_error_text))
+            repaired = self._repair_cache.get(repair_key)
+            if repaired is None:
+                repaired = repair_command_if_needed(
+                    prev_cmd=self.last_failed_command,
+                    last_output_chunk=self.last_error_text,
+                    cwd=self._cwd,
+                    env=self._env,
+                )
+                if isinstance(repaired, str) and repaired.strip():
+                    _lru_put(self._repair_cache, repair_key, repaired)
+            else:
+                self._repair_cache.move_to_end(repair_key)
             if not (isinstance(repaired, str) and repaired.strip()):
                 # No direct fix produced. Offer replan/edit/cancel so repair "works" every time.
                 print(f"\r\n{label('AI','warning')} No automatic fix was generated.", end="\r\n")
@@ -436,17 +648,17 @@ class AITerminal:
                 elif choice.startswith("e"):
                     # Allow user to edit the failing command
                     try:
-                        os.write(self.master_fd, b"\x15")
+                        self._pty_write(b"\x15", self.last_failed_command.encode("utf-8"))
                     except Exception:
                         pass
-                    for ch in self.last_failed_command:
-                        os.write(self.master_fd, ch.encode())
                     os.write(sys.stdout.fileno(), f"{code('$ ' + self.last_failed_command)}\r\n".encode())
                 # cancel otherwise
                 return
 
             self.last_repair_suggestion = repaired
             self._last_repaired_for_cmd = self.last_failed_command
+            # Checked while the user reads the suggestion
+            danger = self._pool.submit(check_danger, repaired)
 
             if self.interactive_repair:
                 choice = self._prompt_fix_choice(self.last_failed_command, self.last_error_text or "", repaired)
@@ -454,8 +666,7 @@ class AITerminal:
                     return
                 if choice == "edit":
                     # Pre-fill the suggestion into readline for manual editing
-                    os.write(self.master_fd, b"\x15")  # clear line
-                    os.write(self.master_fd, repaired.encode("utf-8"))
+                    self._pty_write(b"\x15", repaired.encode("utf-8"))  # clear line, then prefill
                     os.write(sys.stdout.fileno(), f"{code('$ ' + repaired)}\r\n".encode())
                     return
                 if choice == "replan":
@@ -464,12 +675,12 @@ class AITerminal:
                     return
                 # else run
             # Safety approval before executing a repaired command
-            if not approval_gate(repaired, context=self.last_output_text()):
+            if not approval_gate(repaired, context=self.last_output_text(), read_byte=self._read_stdin_byte, danger=danger):
                 print(f"\r\n{label('Repair','warning')} Repaired command rejected\r\n", end="")
                 return
             # Run the repaired command
             self._pending_cmd = repaired
-            self._pending_output_start = len(self.last_output_lines)
+            self._pending_output_start = self._bytes_seen
             self._send_command_immediately(repaired)
         finally:
             self._repair_in_progress = False
@@ -482,19 +693,20 @@ class AITerminal:
     def _handle_replan(self, base_command: str, feedback: str) -> None:
         try:
             state: State = {"candidate_command": base_command, "user_feedback": feedback}
-            out = llm_replan(state)
+            out = _get_nodes().replan(state)
             new_cmd = (out.get("candidate_command") or "").strip()
+            danger = self._pool.submit(check_danger, new_cmd) if new_cmd else None
             expl = out.get("candidate_explanation") or ""
             if expl:
                 print(f"\r\n{label('AI Replan')} {expl}\r\n", end="")
             if not new_cmd:
                 return
             # Approval gate before running
-            if not approval_gate(new_cmd, context=self.last_output_text()):
+            if not approval_gate(new_cmd, context=self.last_output_text(), read_byte=self._read_stdin_byte, danger=danger):
                 print(f"\r\n{label('Replan','warning')} Replanned command rejected\r\n", end="")
                 return
             self._pending_cmd = new_cmd
-            self._pending_output_start = len(self.last_output_lines)
+            self._pending_output_start = self._bytes_seen
             self._send_command_immediately(new_cmd)
         except Exception as e:
             print(f"\r\n{label('Replan','warning')} {color_error(str(e))}\r\n", end="")
@@ -502,56 +714,131 @@ class AITerminal:
     # --- context
 
     def append_output_context(self, data: bytes) -> None:
-        text = data.decode("utf-8", "replace")
-        lines = text.splitlines()
-        for line in lines:
-            self.last_output_lines.append(line)
-            # Heuristic fallback: detect immediate 'command not found' and trigger repair
-            if self._pending_cmd is not None:
-                try:
-                    lower_line = line.lower()
-                except Exception:
-                    lower_line = ""
-                if "command not found" in lower_line:
-                    start = max(0, self._pending_output_start)
-                    error_lines = self.last_output_lines[start:]
+        base = self._bytes_seen
+        self._ring_write(data)
+        # Markers only matter for a command we sent; idle output (prompts, less, man) is just kept
+        if self._pending_cmd is None:
+            self._carry.clear()
+            return
+        # Only complete lines are scanned; a trailing fragment waits for the rest of its
+        # line, so a marker split across two reads is still seen whole
+        carry = self._carry
+        cut = max(data.rfind(b"\n"), data.rfind(b"\r")) + 1
+        if not cut:
+            carry += data
+            if len(carry) > _CARRY_LIMIT:
+                del carry[:-_CARRY_LIMIT]
+            return
+        base -= len(carry)
+        if carry:
+            carry += data[:cut]
+            data, carry[:] = bytes(carry), data[cut:]
+        else:
+            data, carry[:] = data[:cut], data[cut:]
+        if not self._marker_re.search(data):
+            return
+        for m in self._marker_re.finditer(data):
+            line_start = max(data.rfind(b"\n", 0, m.start()), data.rfind(b"\r", 0, m.start())) + 1
+            line_end = _EOL_RE.search(data, m.end()).start()
+            if not m.group(0).startswith(b"[["):
+                # Heuristic fallback: detect immediate 'command not found' and trigger repair
+                if self._pending_cmd is not None:
                     self.last_failed_command = self._pending_cmd
-                    self.last_error_text = "\n".join(error_lines)
+                    self.last_error_text = self._output_since(self._pending_output_start, base + line_end)
                     # Attempt repair without waiting for status marker
                     self._try_auto_repair()
                     # Avoid double-processing when status marker arrives
                     self._pending_cmd = None
-                    self._pending_output_start = len(self.last_output_lines)
-                    continue
-            # Detect our status marker lines: [[AI:STATUS:<code>]]
-            if line.startswith("[[AI:STATUS:") and line.endswith("]]"):
-                try:
-                    code_str = line[len("[[AI:STATUS:"):-2]
-                    exit_code = int(code_str)
-                except Exception:
-                    exit_code = 0
-                # If we had a tracked command, capture its error output when non-zero
-                if self._pending_cmd is not None:
-                    if exit_code != 0:
-                        start = max(0, self._pending_output_start)
-                        # Exclude the status line itself
-                        error_lines = self.last_output_lines[start:-1]
-                        self.last_failed_command = self._pending_cmd
-                        self.last_error_text = "\n".join(error_lines)
-                        # Attempt immediate repair once per failed command
-                        self._try_auto_repair()
-                    else:
-                        # Command succeeded, clear any repair tracking for it
-                        if self._pending_cmd in self._repair_attempts:
-                            del self._repair_attempts[self._pending_cmd]
-                    # Clear for next command
-                    self._pending_cmd = None
-                    self._pending_output_start = len(self.last_output_lines)
-        if len(self.last_output_lines) > self.max_context_lines:
-            self.last_output_lines = self.last_output_lines[-self.max_context_lines:]
+                    self._pending_output_start = base + line_end
+                continue
+            # Inline status marker lines: [[AI:STATUS:<code>]] (only without the status pipe)
+            sm = _STATUS_LINE_RE.fullmatch(data, line_start, line_end)
+            if sm:
+                # Exclude the status line itself
+                self._on_command_status(sm.group(1), base + line_start)
+                self._pending_output_start = base + line_end
+
+    def _on_command_status(self, status: bytes, end: int) -> None:
+        try:
+            exit_code = int(status)
+        except Exception:
+            exit_code = 0
+        # If we had a tracked command, capture its error output when non-zero
+        if self._pending_cmd is not None:
+            if exit_code != 0:
+                self.last_failed_command = self._pending_cmd
+                self.last_error_text = self._output_since(self._pending_output_start, end)
+                # Attempt immediate repair once per failed command
+                self._try_auto_repair()
+            else:
+                # Command succeeded, clear any repair tracking for it
+                if self._pending_cmd in self._repair_attempts:
+                    del self._repair_attempts[self._pending_cmd]
+            # Clear for next command
+            self._pending_cmd = None
+            self._pending_output_start = end
+
+    def _read_status_pipe(self) -> bool:
+        """Handle exit codes bash wrote to the status FIFO; False once it is closed."""
+        try:
+            data = os.read(self._status_fd, 4096)
+        except BlockingIOError:
+            return True
+        if not data:
+            return False
+        # The command's output precedes its status; take it from the PTY first
+        self._drain_pty()
+        self._status_buf += data
+        *statuses, rest = self._status_buf.split(b"\n")
+        self._status_buf = bytearray(rest)
+        self._flush_output()
+        for status in statuses:
+            self._on_command_status(status, self._bytes_seen)
+        return True
+
+    def _drain_pty(self) -> None:
+        while True:
+            try:
+                data = os.read(self.master_fd, _PTY_READ_SIZE)
+            except OSError:
+                return
+            if not data:
+                return
+            self._queue_output(data)
+            self.append_output_context(data)
+
+    def _ring_write(self, data: bytes) -> None:
+        ring = self._ring
+        size = len(ring)
+        view = memoryview(data)[-size:]
+        pos = (self._bytes_seen + len(data) - len(view)) % size
+        head = min(len(view), size - pos)
+        ring[pos:pos + head] = view[:head]
+        ring[:len(view) - head] = view[head:]
+        self._bytes_seen += len(data)
+        self._ring_text = None
+
+    def _ring_bytes(self, start: int, end: int) -> bytes:
+        # Bytes before the ring's oldest position were already overwritten
+        size = len(self._ring)
+        start = max(start, self._bytes_seen - size, 0)
+        end = min(end, self._bytes_seen)
+        if end <= start:
+            return b""
+        a, b = start % size, end % size or size
+        if a < b:
+            return bytes(self._ring[a:b])
+        return bytes(self._ring[a:]) + bytes(self._ring[:b])
+
+    def _output_since(self, start: int, end: Optional[int] = None) -> str:
+        text = self._ring_bytes(start, self._bytes_seen if end is None else end).decode("utf-8", "replace")
+        return "\n".join(text.splitlines())
 
     def last_output_text(self) -> str:
-        return "\n".join(self.last_output_lines)
+        if self._ring_text is None:
+            lines = self._output_since(0).split("\n")
+            self._ring_text = "\n".join(lines[-self.max_context_lines:])
+        return self._ring_text
 
     # --- AI interception point
 
@@ -561,10 +848,11 @@ class AITerminal:
         """
         original_line = user_line_utf8.rstrip("\r\n")
         line = original_line
+        danger: Optional[Future] = None
         
         # Skip empty lines
         if not line.strip():
-            os.write(self.master_fd, b"\n")
+            self._pty_write(b"\n")
             return
         
         # Handle special commands (these should NOT be sent to bash)
@@ -572,68 +860,63 @@ class AITerminal:
         if stripped.startswith("/"):
             # Ensure bash readline is cleared in case any chars leaked
             try:
-                os.write(self.master_fd, b"\x15")  # Ctrl-U clear line
+                self._pty_write(b"\x15")  # Ctrl-U clear line
             except Exception:
                 pass
             # Since we didn't echo to PTY (or we cleared), bash won't run it
             tokens = stripped.split()
             cmd = tokens[0]
             args = tokens[1:]
-            if cmd in ("/q", "/quit", "/exit"):
+            if cmd in _QUIT_COMMANDS:
                 # Send exit command to shell
-                os.write(self.master_fd, b"exit\n")
+                self._pty_write(b"exit\n")
                 return
             elif cmd == "/help":
-                help_text = (
-                    f"\r\n{header('BashBard Commands')}\r\n"
-                    f"  {code('/e <request>')}   Convert natural language to command\r\n"
-                    f"  {code('/repair on')}     Enable auto-repair (interactive approval)\r\n"
-                    f"  {code('/repair auto')}   Enable auto-repair and auto-run fixes\r\n"
-                    f"  {code('/repair off')}    Disable auto-repair (default)\r\n"
-                    f"  {code('/dry on')}        Enable dry-run mode\r\n"
-                    f"  {code('/dry off')}       Disable dry-run mode\r\n"
-                    f"  {code('/help')}          Show this help\r\n"
-                    f"  {code('/quit')}          Exit terminal\r\n\r\n"
-                )
-                os.write(sys.stdout.fileno(), help_text.encode())
+                os.write(sys.stdout.fileno(), _HELP_TEXT)
                 # Just get a new prompt - bash never saw the /help command
-                os.write(self.master_fd, b"\n")
+                self._pty_write(b"\n")
                 return
             elif cmd == "/repair":
                 sub = (args[0].lower() if args else "on")
                 if sub in ("on", "interactive"):
                     self.auto_repair = True
                     self.interactive_repair = True
-                    os.write(sys.stdout.fileno(), f"\r\n{label('Repair','success')} Auto-repair enabled with interactive approval\r\n".encode())
+                    os.write(sys.stdout.fileno(), _REPAIR_ON_MSG)
                 elif sub == "auto":
                     self.auto_repair = True
                     self.interactive_repair = False
-                    os.write(sys.stdout.fileno(), f"\r\n{label('Repair','success')} Auto-repair enabled: auto-run fixes\r\n".encode())
+                    os.write(sys.stdout.fileno(), _REPAIR_AUTO_MSG)
                 elif sub == "off":
                     self.auto_repair = False
-                    os.write(sys.stdout.fileno(), f"\r\n{label('Repair','muted')} Auto-repair disabled\r\n".encode())
+                    os.write(sys.stdout.fileno(), _REPAIR_OFF_MSG)
                 else:
-                    os.write(sys.stdout.fileno(), f"\r\n{label('Usage','muted')} /repair [on|interactive|auto|off]\r\n".encode())
-                os.write(self.master_fd, b"\n")
+                    os.write(sys.stdout.fileno(), _REPAIR_USAGE_MSG)
+                self._pty_write(b"\n")
                 return
             elif cmd.startswith("/e"):
                 # Natural language request
-                remainder = stripped[len("/e"):].strip()
+                remainder = " ".join(stripped[len("/e"):].split())
                 if remainder:
                     # Ensure any provider/status prints start on a fresh line
                     try:
                         os.write(sys.stdout.fileno(), b"\r\n")
                     except Exception:
                         pass
+                    previous = self._recent_translations.get(remainder)
+                    if previous:
+                        # Warm check_danger's memo for the likely result while the LLM runs
+                        self._pool.submit(check_danger, previous)
                     transformed = english_to_command_if_needed(
                         remainder,
-                        cwd=os.getcwd(),
-                        env=dict(os.environ),
+                        cwd=self._cwd,
+                        env=self._env,
                     )
                     if not isinstance(transformed, str):
                         transformed = ""
                     transformed = transformed.strip()
                     if transformed:
+                        danger = self._pool.submit(check_danger, transformed)
+                        _lru_put(self._recent_translations, remainder, transformed)
                         line = transformed
                         os.write(sys.stdout.fileno(), f"{code('$ ' + line)}\r\n".encode())
                     else:
@@ -647,45 +930,45 @@ class AITerminal:
                             self._handle_replan("", fb)
                         elif choice.startswith("e"):
                             try:
-                                os.write(self.master_fd, b"\x15")
+                                self._pty_write(b"\x15")
                             except Exception:
                                 pass
                             # Let user type new command; show a fresh prompt
                             os.write(sys.stdout.fileno(), b"\r\n")
                         else:
-                            os.write(self.master_fd, b"\n")
+                            self._pty_write(b"\n")
                         return
                 else:
                     os.write(sys.stdout.fileno(), f"\r\n{label('Usage','muted')} /e <natural language request>\r\n".encode())
-                    os.write(self.master_fd, b"\n")  # Get new prompt
+                    self._pty_write(b"\n")  # Get new prompt
                     return
             else:
                 # Unknown / command - let bash handle it (might be a path like /usr/bin/ls)
                 # Since we intercepted it, we need to send the full command to bash
-                os.write(self.master_fd, (line + "\n").encode("utf-8"))
+                self._pty_write((line + "\n").encode("utf-8"))
                 return
         
         # Apply approval gate for generated commands
         if line != original_line:  # Command was transformed
-            if not approval_gate(line, context=self.last_output_text()):
+            if not approval_gate(line, context=self.last_output_text(), read_byte=self._read_stdin_byte, danger=danger):
                 os.write(sys.stdout.fileno(), f"\r\n{label('Approval','warning')} Command rejected\r\n".encode())
-                os.write(self.master_fd, b"\n")  # Get new prompt
+                self._pty_write(b"\n")  # Get new prompt
                 return
         
         # Check if dry-run mode
         if self.dry_run:
             os.write(sys.stdout.fileno(), f"\r\n{label('DRY-RUN','muted')} Would execute: {code('$ ' + line)}\r\n".encode())
-            os.write(self.master_fd, b"\n")  # Get new prompt
+            self._pty_write(b"\n")  # Get new prompt
             return
         
         # Mark the start of this command's output for error tracking
         self._pending_cmd = line
-        self._pending_output_start = len(self.last_output_lines)
+        self._pending_output_start = self._bytes_seen
         
         # Send to the real shell
         if line == original_line:
             # User typed command directly - just send newline
-            os.write(self.master_fd, b"\n")
+            self._pty_write(b"\n")
         else:
             # Safe to re-install here because we control the whole line send
             try:
@@ -693,7 +976,167 @@ class AITerminal:
             except Exception:
                 pass
             # Replace the current readline buffer with the transformed command
-            os.write(self.master_fd, (line + "\n").encode("utf-8"))
+            self._pty_write((line + "\n").encode("utf-8"))
+
+    # --- input
+
+    def _process_stdin(self) -> None:
+        """Run buffered keystrokes through the line-interception state machine."""
+        keys = bytearray()  # consecutive plain keystrokes, forwarded in one write
+
+        def flush_keys() -> None:
+            if keys:
+                # Special commands are echoed to the screen only; bash never sees them
+                if self._typing_special_command:
+                    os.write(sys.stdout.fileno(), keys)
+                else:
+                    self._pty_write(keys)  # queued remainders are copied out by _pty_write
+                keys.clear()
+
+        while self._stdin_pos < len(self._stdin_pending):
+            run = _PLAIN_KEYS_RE.match(self._stdin_pending, self._stdin_pos)
+            if run:
+                plain = run.group(0)
+                self._stdin_pos = run.end()
+                # Sticky detection: if first char typed is '/', treat whole line as special
+                if not self.line_buffer and plain[0] == _SLASH:
+                    self._typing_special_command = True
+                # Keep our mirror buffer for the upcoming Enter
+                self.line_buffer += plain
+                keys += plain
+                continue
+
+            # Control bytes are handled as ints straight from the read-ahead; no bytes objects
+            ch = self._stdin_pending[self._stdin_pos]
+            self._stdin_pos += 1
+            kind = _KEY_KIND[ch]
+
+            # Map raw control keys to signals
+            if kind == _KEY_SIGNAL:
+                flush_keys()
+                sig = _KEY_SIGNALS[ch]
+                self.forward_signal(sig)
+                if sig == signal.SIGINT:
+                    self.line_buffer.clear()  # Clear buffer on Ctrl-C
+                    self._typing_special_command = False  # Reset special command flag
+                continue
+
+            # Handle backspace/delete
+            if kind == _KEY_ERASE:
+                if self.line_buffer:
+                    del self.line_buffer[-1:]
+                    if not self.line_buffer and self._typing_special_command:
+                        # Only reset once buffer empties; echo queued so far still goes to the screen
+                        flush_keys()
+                        self._typing_special_command = False
+                # Always pass backspace to PTY unless we're in special command mode,
+                # where it is echoed to the screen for visual feedback instead
+                if self._typing_special_command:
+                    keys += b"\b \b"
+                else:
+                    keys.append(ch)
+                continue
+
+            # Intercept only on newline; otherwise pass through
+            if kind == _KEY_ENTER:
+                flush_keys()
+                self._flush_output()
+                try:
+                    line = self.line_buffer.decode("utf-8", "replace")
+                finally:
+                    self.line_buffer.clear()
+                    # Always reset special command mode on newline
+                    # so that subsequent non-slash commands are sent to the PTY.
+                    self._typing_special_command = False
+                # Our interception point
+                self.gate_and_send(line)
+        flush_keys()
+
+    # --- output
+
+    def _flush_output(self) -> None:
+        if self._out_buf:
+            _write_all(sys.stdout.fileno(), self._out_buf)
+            self._out_buf.clear()
+        self._flush_deadline = None
+
+    def _queue_output(self, data: bytes) -> None:
+        self._out_buf += data
+        if len(data) < _OUT_SMALL_READ or len(self._out_buf) >= _OUT_FLUSH_BYTES or _STATUS_MARKER in data:
+            self._flush_output()
+        elif self._flush_deadline is None:
+            self._flush_deadline = time.monotonic() + _OUT_FLUSH_DELAY
+
+    def _splice_output(self) -> Optional[bool]:
+        """Move PTY output to stdout kernel-side; False at EOF, None if splicing is unsupported."""
+        self._flush_output()
+        try:
+            if self._splice_pipe is None:
+                self._splice_pipe = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+            pipe_r, pipe_w = self._splice_pipe
+            n = os.splice(self.master_fd, pipe_w, _PTY_READ_SIZE, flags=os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK)
+        except BlockingIOError:
+            return True
+        except OSError as e:
+            if e.errno == errno.EIO:
+                return False  # PTY closed
+            self._splice_ok = False
+            return None
+        if n == 0:
+            return False
+        out_fd = sys.stdout.fileno()
+        try:
+            while n:
+                n -= os.splice(pipe_r, out_fd, n, flags=os.SPLICE_F_MOVE)
+        except OSError:
+            # stdout can't be spliced to; hand what's left in the pipe over normally
+            self._splice_ok = False
+            _write_all(out_fd, os.read(pipe_r, n))
+        return True
+
+    def _pty_write(self, *parts: bytes) -> None:
+        """Write to the PTY without blocking; keeps strict FIFO order with queued data.
+
+        Several parts go out in one writev() call.
+        """
+        if self.master_fd is None:
+            return
+        parts = [p for p in parts if p]
+        if not parts:
+            return
+        if not self._pty_out_queue:
+            try:
+                n = os.writev(self.master_fd, parts) if len(parts) > 1 else os.write(self.master_fd, parts[0])
+            except BlockingIOError:
+                n = 0
+            if n == sum(map(len, parts)):
+                return
+            data = b"".join(parts)[n:]
+        else:
+            data = b"".join(parts)
+        self._pty_out_queue.append(data)
+        self._watch_pty_writable(True)
+
+    def _drain_pty_queue(self) -> None:
+        queue = self._pty_out_queue
+        while queue:
+            data = queue[0]
+            try:
+                n = os.write(self.master_fd, data)
+            except BlockingIOError:
+                return
+            if n < len(data):
+                queue[0] = data[n:]
+                return
+            queue.popleft()
+        self._watch_pty_writable(False)
+
+    def _watch_pty_writable(self, on: bool) -> None:
+        if self._sel is None or on == self._pty_write_armed:
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if on else 0)
+        self._sel.modify(self.master_fd, events)
+        self._pty_write_armed = on
 
     # --- main loop
 
@@ -707,83 +1150,79 @@ class AITerminal:
         self.install_status_prompt()
         self.enter_raw()
         
+        # Registered once (epoll on Linux) instead of rebuilding fd sets per wakeup
+        stdin_fd = sys.stdin.fileno()
+        sel = self._sel = selectors.DefaultSelector()
+        sel.register(self.master_fd, selectors.EVENT_READ)
+        sel.register(stdin_fd, selectors.EVENT_READ)
+        if self._status_fd is not None:
+            sel.register(self._status_fd, selectors.EVENT_READ)
+        if self._pty_out_queue:
+            self._watch_pty_writable(True)
         try:
             while True:
-                r, _, _ = select.select([self.master_fd, sys.stdin], [], [])
+                timeout = None
+                if self._flush_deadline is not None:
+                    timeout = max(0.0, self._flush_deadline - time.monotonic())
+                r = {key.fd: mask for key, mask in sel.select(timeout)}
+                if self._flush_deadline is not None and time.monotonic() >= self._flush_deadline:
+                    self._flush_output()
+
+                if r.get(self.master_fd, 0) & selectors.EVENT_WRITE:
+                    try:
+                        self._drain_pty_queue()
+                    except OSError:
+                        break
                 
                 # PTY → user
-                if self.master_fd in r:
+                if r.get(self.master_fd, 0) & selectors.EVENT_READ:
                     try:
-                        data = os.read(self.master_fd, 4096)
-                        if not data:
+                        spliced = None
+                        # Output that no tracked command needs never enters Python
+                        if self._splice_ok and self._pending_cmd is None and not self.auto_repair:
+                            spliced = self._splice_output()
+                        if spliced is False:
                             break  # child exited
-                        # show raw bytes (preserve colors)
-                        os.write(sys.stdout.fileno(), data)
-                        self.append_output_context(data)
+                        if spliced is None:
+                            data = os.read(self.master_fd, _PTY_READ_SIZE)
+                            if not data:
+                                break  # child exited
+                            # show raw bytes (preserve colors)
+                            self._queue_output(data)
+                            self.append_output_context(data)
+                    except BlockingIOError:
+                        pass
                     except OSError:
                         break
                 
+                if self._status_fd is not None and self._status_fd in r:
+                    if not self._read_status_pipe():
+                        sel.unregister(self._status_fd)
+                        os.close(self._status_fd)
+                        self._status_fd = None
+
                 # user → PTY (with newline interception)
-                if sys.stdin in r:
-                    ch = os.read(sys.stdin.fileno(), 1)
-                    if not ch:
+                if stdin_fd in r:
+                    chunk = os.read(stdin_fd, _STDIN_READ_SIZE)
+                    if not chunk:
                         break  # stdin closed
-                    
-                    # Map raw control keys to signals
-                    if ch == b"\x03":  # Ctrl-C
-                        self.forward_signal(signal.SIGINT)
-                        self.line_buffer.clear()  # Clear buffer on Ctrl-C
-                        self._typing_special_command = False  # Reset special command flag
-                        continue
-                    if ch == b"\x1a":  # Ctrl-Z
-                        self.forward_signal(signal.SIGTSTP)
-                        continue
-                    if ch == b"\x1c":  # Ctrl-\
-                        self.forward_signal(signal.SIGQUIT)
-                        continue
-                    
-                    # Handle backspace/delete
-                    if ch in (b"\x7f", b"\x08"):  # Backspace or Del
-                        if self.line_buffer:
-                            self.line_buffer = self.line_buffer[:-1]
-                            if not self.line_buffer:
-                                # Only reset once buffer empties
-                                self._typing_special_command = False
-                        # Always pass backspace to PTY unless we're in special command mode
-                        if not self._typing_special_command:
-                            os.write(self.master_fd, ch)
-                        else:
-                            # Echo backspace to screen for visual feedback
-                            os.write(sys.stdout.fileno(), b"\b \b")
-                        continue
-                    
-                    # Intercept only on newline; otherwise pass through
-                    if ch in (b"\r", b"\n"):
-                        try:
-                            line = self.line_buffer.decode("utf-8", "replace")
-                        finally:
-                            self.line_buffer.clear()
-                            # Always reset special command mode on newline
-                            # so that subsequent non-slash commands are sent to the PTY.
-                            self._typing_special_command = False
-                        # Our interception point
-                        self.gate_and_send(line)
-                    else:
-                        # Keep our mirror buffer for the upcoming Enter
-                        was_empty = len(self.line_buffer) == 0
-                        self.line_buffer += ch
-                        # Sticky detection: if first char typed is '/', treat whole line as special
-                        if was_empty and ch == b"/":
-                            self._typing_special_command = True
-                        # Handle echoing based on whether we're typing a special command
-                        if self._typing_special_command:
-                            # Don't send to PTY, just echo to screen so user sees what they're typing
-                            os.write(sys.stdout.fileno(), ch)
-                        else:
-                            # Normal operation - echo to PTY
-                            os.write(self.master_fd, ch)
+                    self._feed_stdin(chunk)
+                    self._process_stdin()
         
         finally:
+            try:
+                self._flush_output()
+            except OSError:
+                pass
+            sel.close()
+            self._sel = None
+            for fd in self._splice_pipe or ():
+                os.close(fd)
+            if self._status_fd is not None:
+                os.close(self._status_fd)
+                self._status_fd = None
+            self._remove_status_fifo()
+            self._pool.shutdown(wait=False)
             self.restore_tattr()
             try:
                 if self.child_pid:
@@ -800,11 +1239,8 @@ class AITerminal:
 def main():
     """Entry point for standalone terminal usage."""
     import argparse
-    from dotenv import load_dotenv
-    
-    # Load environment variables
-    load_dotenv()
-    
+
+    # .env is already loaded: importing this module imports the package, whose cli module loads it
     parser = argparse.ArgumentParser(description="BashBard AI Terminal")
     parser.add_argument("--dry-run", action="store_true", help="Enable dry-run mode")
     parser.add_argument("--quiet", action="store_true", help="Reduce output verbosity")
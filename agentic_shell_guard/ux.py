@@ -10,6 +10,7 @@ from __future__ import annotations
 import os
 import sys
 from shutil import get_terminal_size
+from typing import Optional
 
 
 def _supports_color(stream) -> bool:
@@ -40,10 +41,15 @@ class SGR:
     GRAY = "\x1b[90m"
 
 
-def style(text: str, *codes: str) -> str:
-    if not _COLOR_ENABLED or not text:
+# Color support is fixed at import, so pick the implementation once
+if _COLOR_ENABLED:
+    def style(text: str, *codes: str) -> str:
+        if not text:
+            return text
+        return "".join(codes) + text + SGR.RESET
+else:
+    def style(text: str, *codes: str) -> str:
         return text
-    return "".join(codes) + text + SGR.RESET
 
 
 def bold(text: str) -> str:
@@ -70,28 +76,33 @@ def error(text: str) -> str:
     return style(text, SGR.RED)
 
 
+# SGR prefix per kind, concatenated once; anything else renders as "info"
+_LABEL_STYLES = {
+    "info": SGR.BOLD + SGR.CYAN,
+    "success": SGR.BOLD + SGR.GREEN,
+    "warning": SGR.BOLD + SGR.YELLOW,
+    "danger": SGR.BOLD + SGR.RED,
+    "muted": SGR.GRAY,
+}
+_HEADER_STYLES = {
+    "info": SGR.CYAN + SGR.BOLD,
+    "success": SGR.GREEN + SGR.BOLD,
+    "warning": SGR.YELLOW + SGR.BOLD,
+    "danger": SGR.RED + SGR.BOLD,
+}
+
+
 def label(name: str, kind: str = "info") -> str:
-    name = name.upper()
-    if kind == "success":
-        return style(f"[{name}]", SGR.BOLD, SGR.GREEN)
-    if kind == "warning":
-        return style(f"[{name}]", SGR.BOLD, SGR.YELLOW)
-    if kind == "danger":
-        return style(f"[{name}]", SGR.BOLD, SGR.RED)
-    if kind == "muted":
-        return style(f"[{name}]", SGR.GRAY)
-    return style(f"[{name}]", SGR.BOLD, SGR.CYAN)
+    if not _COLOR_ENABLED:
+        return f"[{name.upper()}]"
+    return f"{_LABEL_STYLES.get(kind, _LABEL_STYLES['info'])}[{name.upper()}]{SGR.RESET}"
 
 
 def header(title: str, kind: str = "info") -> str:
     """Single-line header with color and emphasis."""
-    if kind == "danger":
-        return style(bold(title), SGR.RED)
-    if kind == "success":
-        return style(bold(title), SGR.GREEN)
-    if kind == "warning":
-        return style(bold(title), SGR.YELLOW)
-    return style(bold(title), SGR.CYAN)
+    if not _COLOR_ENABLED or not title:
+        return title
+    return f"{_HEADER_STYLES.get(kind, _HEADER_STYLES['info'])}{title}{SGR.RESET}"
 
 
 def bullet(text_line: str) -> str:
@@ -103,11 +114,23 @@ def kv_line(key: str, value: str, key_width: int = 10) -> str:
     return f"  {k} {value}"
 
 
+_term_width: Optional[int] = None
+
+
+def refresh_term_width() -> None:
+    """Drop the cached width; call on SIGWINCH."""
+    global _term_width
+    _term_width = None
+
+
 def term_width(default: int = 80) -> int:
-    try:
-        return get_terminal_size().columns or default
-    except Exception:
-        return default
+    global _term_width
+    if _term_width is None:
+        try:
+            _term_width = get_terminal_size().columns or 0
+        except Exception:
+            _term_width = 0
+    return _term_width or default
 
 
 __all__ = [
@@ -124,6 +147,7 @@ __all__ = [
     "bullet",
     "kv_line",
     "term_width",
+    "refresh_term_width",
 ]
 
 
@@ -0,0 +1,65 @@
+"""
+Message framing shared by the daemon and DaemonClient.
+
+Two framings are accepted on the daemon socket:
+- NDJSON lines, used by the bash hook (socat / inline python)
+- length-prefixed frames, used by DaemonClient: the connection starts with
+  FRAMED_MAGIC, then every message is a little-endian uint32 length followed
+  by that many bytes of JSON, so readers never scan payloads for newlines
+
+Uses orjson when installed (bytes in/out, no intermediate str), otherwise
+falls back to the stdlib json module.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            if isinstance(data, str):
+                raise
+            # orjson rejects invalid UTF-8; retry leniently like the stdlib path
+            return orjson.loads(bytes(data).decode("utf-8", errors="replace"))
+    if isinstance(data, str):
+        return json.loads(data)
+    return json.loads(bytes(data).decode("utf-8", errors="replace"))
+
+
+# NDJSON never starts with NUL, so this byte unambiguously selects framed mode
+FRAMED_MAGIC = b"\x00"
+HEADER = struct.Struct("<I")
+MAX_FRAME = 16 * 1024 * 1024
+
+
+def encode_line(obj: Any) -> bytes:
+    return dumps(obj) + b"\n"
+
+
+def frame_header(length: int) -> bytes:
+    return HEADER.pack(length)
+
+
+def encode_frame(obj: Any) -> bytes:
+    payload = dumps(obj)
+    return HEADER.pack(len(payload)) + payload
+
+
+__all__ = ["FRAMED_MAGIC", "HEADER", "MAX_FRAME", "dumps", "loads", "encode_line", "frame_header", "encode_frame"]